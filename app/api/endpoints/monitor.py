@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
 from datetime import datetime
 
-from app.services.email_service import email_service
+from app.services.email_service import get_email_service
 from app.core.auth import get_current_admin_user
 
 router = APIRouter()
@@ -24,7 +24,7 @@ async def get_email_queue_status(
         - is_business_hours: Whether currently in business hours
     """
     try:
-        status = email_service.get_queue_status()
+        status = get_email_service().get_queue_status()
 
         # Add timestamp and user info
         status.update({
@@ -55,7 +55,7 @@ async def get_email_health(
         - queue_health: Status of main and retry queues
     """
     try:
-        metrics = email_service.metrics.to_dict()
+        metrics = get_email_service().metrics.to_dict()
 
         # Determine overall health
         is_healthy = (
@@ -0,0 +1,98 @@
+import logging
+import time
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# A probe handler returns (status_code, media_type, body)
+ProbeHandler = Callable[[], Tuple[int, str, bytes]]
+
+
+def cached_probe(ttl: float) -> Callable[[ProbeHandler], ProbeHandler]:
+    """Reuse a probe handler's response, success or failure, for ttl seconds.
+
+    Handlers are synchronous and run on the event loop, so concurrent probes
+    within the window never trigger more than one evaluation.
+    """
+    def decorator(func: ProbeHandler) -> ProbeHandler:
+        expires_at = 0.0
+        result: Optional[Tuple[int, str, bytes]] = None
+
+        @wraps(func)
+        def wrapper() -> Tuple[int, str, bytes]:
+            nonlocal expires_at, result
+            now = time.monotonic()
+            if result is None or now >= expires_at:
+                result = func()
+                expires_at = now + ttl
+            return result
+
+        return wrapper
+    return decorator
+
+
+class HealthCheckInterceptor:
+    """Pure ASGI wrapper that answers probe paths before the FastAPI stack.
+
+    Requests for the registered paths are served by small synchronous
+    handlers, or handed straight to a dedicated ASGI app, without routing,
+    dependency injection or middleware. Everything else, including lifespan
+    events, is passed through to the wrapped app.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        handlers: Dict[str, ProbeHandler],
+        apps: Optional[Dict[str, ASGIApp]] = None
+    ):
+        self.app = app
+        self.handlers = handlers
+        self.apps = apps or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in self.apps:
+            await self.apps[path](scope, receive, send)
+            return
+        if path not in self.handlers:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method not in ("GET", "HEAD"):
+            await self._send(send, 405, b"text/plain", b"Method Not Allowed", allow=True)
+            return
+
+        try:
+            status, media_type, body = self.handlers[scope["path"]]()
+        except Exception as e:
+            logger.error(f"Probe {scope['path']} failed: {str(e)}")
+            status, media_type, body = 500, "text/plain", b"Internal Server Error"
+
+        await self._send(send, status, media_type.encode(), body, head=method == "HEAD")
+
+    @staticmethod
+    async def _send(
+        send: Send,
+        status: int,
+        media_type: bytes,
+        body: bytes,
+        allow: bool = False,
+        head: bool = False
+    ) -> None:
+        headers = [
+            (b"content-type", media_type),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if allow:
+            headers.append((b"allow", b"GET, HEAD"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if head else body})
@@ -1,9 +1,10 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from app.api.dependencies import get_current_active_user, get_current_admin_user
 from app.services.supabase_client import get_supabase_client
+from app.services.google_sheets import get_google_sheets_service
 from app.models.priority import priority_scorer
 from app.jobs.sheet_sync import sheet_sync
 
@@ -34,8 +35,7 @@ class Lead(LeadBase):
     updated_at: datetime
     priority_score: Optional[float] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 @router.get("/", response_model=List[Lead])
 async def get_leads(
@@ -55,9 +55,14 @@ async def get_leads(
         result = query.range(skip, skip + limit - 1).execute()
         leads = result.data or []
 
-        # Calculate priority scores
+        # Calculate priority scores from one bulk conversation fetch
+        conversations = await get_supabase_client().fetch_recent_conversations_bulk(
+            [lead["id"] for lead in leads], limit=100
+        )
         for lead in leads:
-            lead["priority_score"] = priority_scorer.calculate_priority_score(lead)
+            lead["priority_score"] = priority_scorer.calculate_priority_score(
+                lead, conversations.get(lead["id"], [])
+            )
 
         return leads
     except Exception as e:
@@ -77,8 +82,11 @@ async def get_priority_leads(
         result = get_supabase_client().client.table("leads").select("*").eq("status", "Active").execute()
         leads = result.data or []
 
-        # Get priority batch
-        priority_leads = priority_scorer.get_priority_batch(leads, batch_size)
+        # Get priority batch from one bulk conversation fetch
+        conversations = await get_supabase_client().fetch_recent_conversations_bulk(
+            [lead["id"] for lead in leads], limit=100
+        )
+        priority_leads = priority_scorer.get_priority_batch(leads, batch_size, conversations)
         return priority_leads
     except Exception as e:
         raise HTTPException(
@@ -93,7 +101,9 @@ async def get_lead(
 ):
     """Get a specific lead by ID."""
     try:
-        lead = get_supabase_client().get_lead_details(lead_id)
+        lead, conversations = await get_supabase_client().get_lead_with_recent_conversations(
+            lead_id, limit=100
+        )
         if not lead:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -101,7 +111,7 @@ async def get_lead(
             )
 
         # Calculate priority score
-        lead["priority_score"] = priority_scorer.calculate_priority_score(lead)
+        lead["priority_score"] = priority_scorer.calculate_priority_score(lead, conversations)
         return lead
     except HTTPException:
         raise
@@ -119,7 +129,7 @@ async def create_lead(
     """Create a new lead."""
     try:
         # Insert into Supabase
-        result = get_supabase_client().client.table("leads").insert(lead.dict()).execute()
+        result = get_supabase_client().client.table("leads").insert(lead.model_dump()).execute()
         new_lead = result.data[0] if result.data else None
 
         if not new_lead:
@@ -127,6 +137,7 @@ async def create_lead(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create lead"
             )
+        get_google_sheets_service().invalidate("leads")
 
         # Sync to Google Sheets if available
         if sheet_sync.worksheet:
@@ -155,7 +166,7 @@ async def update_lead(
     try:
         # Update in Supabase
         result = get_supabase_client().client.table("leads").update(
-            lead_update.dict(exclude_unset=True)
+            lead_update.model_dump(exclude_unset=True)
         ).eq("id", lead_id).execute()
 
         updated_lead = result.data[0] if result.data else None
@@ -164,6 +175,7 @@ async def update_lead(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Lead not found"
             )
+        get_google_sheets_service().invalidate("leads")
 
         # Sync to Google Sheets if available
         if sheet_sync.worksheet:
@@ -197,6 +209,7 @@ async def delete_lead(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Lead not found"
             )
+        get_google_sheets_service().invalidate("leads")
     except HTTPException:
         raise
     except Exception as e:
@@ -3,8 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 from app.api.dependencies import get_current_active_user, get_current_admin_user
-from app.services.kixie_handler import kixie_handler
-from app.services.email_service import email_service
+from app.services.kixie_handler import get_kixie_handler
+from app.services.email_service import get_email_service
 from app.services.supabase_client import get_supabase_client
 from app.jobs.scheduler_service import run_followups
 
@@ -34,7 +34,7 @@ async def send_sms(
     """Send an SMS message."""
     try:
         # Send SMS via Kixie
-        response = await kixie_handler.send_sms(
+        response = await get_kixie_handler().send_sms(
             message.phone,
             message.message,
             message.lead_id
@@ -54,7 +54,7 @@ async def send_email(
     """Send an email using a template."""
     try:
         # Send email
-        response = await email_service.send_email(
+        response = await get_email_service().send_email(
             to_email=email.to_email,
             subject=email.subject,
             template_name=email.template_name,
@@ -76,7 +76,7 @@ async def kixie_webhook(
     """Handle incoming Kixie webhooks."""
     try:
         # Process webhook
-        response = await kixie_handler.handle_webhook(webhook_data.data)
+        response = await get_kixie_handler().handle_webhook(webhook_data.data)
         return response
     except Exception as e:
         raise HTTPException(
@@ -108,7 +108,7 @@ async def send_daily_report(
     """Send daily report to configured recipients."""
     try:
         # Send daily report
-        response = await email_service.send_daily_report()
+        response = await get_email_service().send_daily_report()
         return response
     except Exception as e:
         raise HTTPException(
@@ -1,5 +1,7 @@
 from celery import Celery
+from celery.signals import worker_shutdown
 from app.services.config_manager import settings
+from app.services.supabase_service import supabase_service
 
 celery = Celery(
     "lead_followup",
@@ -12,3 +14,9 @@ celery.conf.task_routes = {
     "app.scheduler.flush_and_summary": {"queue": "followups"},
     "app.scheduler.handle_chord_error": {"queue": "followups"},
 }
+
+
+@worker_shutdown.connect
+def flush_followup_logs(**kwargs):
+    """Write follow-up logs still buffered when the worker stops."""
+    supabase_service.flush()
@@ -0,0 +1,3 @@
+# Defaults for app.core.decorators.with_retry
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 2
@@ -12,7 +12,15 @@ def with_retry(
     max_retries: int = DEFAULT_MAX_RETRIES,
     backoff_base: int = DEFAULT_BACKOFF_BASE,
     error_counter: Any = None,
+    base_delay: float = 0.2,
+    max_delay: float = 30.0,
 ) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Retry a call with truncated exponential backoff and full jitter.
+
+    Attempt n sleeps a random time in [0, min(max_delay, base_delay *
+    backoff_base**n)], so callers throttled together (e.g. by a 429) spread
+    out instead of retrying in lockstep.
+    """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> T:
@@ -25,8 +33,8 @@ def with_retry(
                     if error_counter:
                         error_counter.inc()
                     if attempt < max_retries - 1:
-                        sleep_time = backoff_base**attempt + random.random()
-                        time.sleep(sleep_time)
+                        cap = min(max_delay, base_delay * backoff_base**attempt)
+                        time.sleep(random.uniform(0, cap))
             raise last_error
 
         return wrapper
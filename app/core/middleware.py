@@ -0,0 +1,89 @@
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# UTC ISO timestamp of the current HTTP request, computed on first use
+_request_timestamp: ContextVar[Optional[str]] = ContextVar("request_timestamp", default=None)
+
+
+def get_request_timestamp() -> str:
+    """Return the timestamp shared by everything handling the current request."""
+    timestamp = _request_timestamp.get()
+    if timestamp is None:
+        timestamp = datetime.utcnow().isoformat()
+        _request_timestamp.set(timestamp)
+    return timestamp
+
+
+class TimingMiddleware:
+    """Pure ASGI middleware that adds an X-Process-Time header to HTTP responses.
+
+    Also resets the per-request timestamp used by get_request_timestamp().
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        _request_timestamp.set(None)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = (time.perf_counter_ns() - start) / 1_000_000_000
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-process-time", b"%.6f" % elapsed),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles HTTP requests carrying ?profile=1.
+
+    The wrapped response is discarded and replaced by pyinstrument's HTML
+    report. Only mounted when settings.PROFILING is enabled.
+    """
+
+    def __init__(self, app: ASGIApp, interval: float = 0.001):
+        from pyinstrument import Profiler
+
+        self.app = app
+        self.interval = interval
+        self._profiler_cls = Profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "profile" not in parse_qs(scope["query_string"].decode()):
+            await self.app(scope, receive, send)
+            return
+
+        async def discard(message: Message) -> None:
+            pass
+
+        profiler = self._profiler_cls(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        body = profiler.output_html().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/html; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
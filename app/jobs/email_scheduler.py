@@ -6,7 +6,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from app.services.config_manager import get_settings
-from app.services.email_service import email_service
+from app.services.email_service import get_email_service
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -18,6 +18,8 @@ async def _process_queue() -> Dict[str, int]:
     start_time = datetime.now()
 
     try:
+        email_service = get_email_service()
+
         # Get current queue size
         queue_size = len(email_service.email_queue)
         if not queue_size:
@@ -30,8 +32,10 @@ async def _process_queue() -> Dict[str, int]:
         batch_size = settings.EMAIL_BATCH_SIZE
         results = {"processed": 0, "sent": 0, "failed": 0}
 
+        # The queue is a deque, which does not support slicing
+        queued = list(email_service.email_queue)
         for i in range(0, queue_size, batch_size):
-            batch = email_service.email_queue[i:i + batch_size]
+            batch = queued[i:i + batch_size]
             tasks = []
 
             for email_data in batch:
@@ -75,7 +79,7 @@ async def _process_queue() -> Dict[str, int]:
 
 async def _monitor_queue_size():
     """Monitor and log queue size periodically."""
-    queue_size = len(email_service.email_queue)
+    queue_size = len(get_email_service().email_queue)
     if queue_size > 0:
         logger.info(f"Current email queue size: {queue_size}")
 
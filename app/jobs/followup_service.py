@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from app.services.config_manager import get_settings
 from app.services.supabase_client import get_supabase_client
-from app.services.email_service import email_service
+from app.services.email_service import get_email_service
 from app.services.retry_logger import with_retry_logging, retry_logger
 import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -14,7 +14,6 @@ settings = get_settings()
 class FollowupService:
     def __init__(self):
         self.supabase = get_supabase_client()
-        self.email_service = email_service
         self.alert_threshold = settings.FOLLOWUP_QUEUE_ALERT_THRESHOLD
         self.scheduler = AsyncIOScheduler()
         self.metrics = {
@@ -27,6 +26,11 @@ class FollowupService:
         }
         self._is_started = False
 
+    @property
+    def email_service(self):
+        # Resolved on use so importing this module doesn't start the email service
+        return get_email_service()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get follow-up service statistics."""
         return {
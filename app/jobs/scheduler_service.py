@@ -22,17 +22,26 @@ async def run_followups():
             logger.exception("Failed to fetch leads: %s", e)
             raise
 
+        # fetch conversations for every lead in bulk
+        conversations = await get_supabase_client().fetch_recent_conversations_bulk(
+            [lead["id"] for lead in leads], limit=1000
+        )
+
         tasks = []
         for lead in leads:
             try:
-                # respect 24h throttle
-                last = await get_supabase_client().fetch_recent_conversations(lead["id"], limit=1)
+                # respect 24h throttle; without history it can't be checked
+                lead_conversations = conversations.get(lead["id"])
+                if lead_conversations is None:
+                    logger.warning("Skipping lead %s: conversations unavailable", lead["id"])
+                    continue
+                last = lead_conversations[:1]
                 if last:
                     last_ts = datetime.fromisoformat(last[0]["timestamp"])
                     if (datetime.utcnow() - last_ts).total_seconds() < settings.FOLLOWUP_THROTTLE_SECONDS:
                         continue
 
-                score = priority_scorer.compute(lead)
+                score = priority_scorer.compute(lead, lead_conversations)
                 if score < settings.FOLLOWUP_MIN_SCORE:
                     continue
                 # schedule message
@@ -1,8 +1,8 @@
 from typing import List, Dict, Any, Optional
 import logging
-import json
 from datetime import datetime
 import gspread
+from gspread.utils import rowcol_to_a1
 from google.oauth2.service_account import Credentials
 from app.services.config_manager import settings
 from app.services.supabase_client import get_supabase_client
@@ -21,6 +21,10 @@ class SheetSync:
     def __init__(self):
         self.client = None
         self.worksheet = None
+        # Lead ID -> sheet row, shared only by the updates of one batch
+        self._row_index: Optional[Dict[str, int]] = None
+        # Range updates queued by update_lead_status(flush=False)
+        self._pending_updates: List[Dict[str, Any]] = []
         self._initialize_client()
 
     def _initialize_client(self) -> None:
@@ -30,7 +34,7 @@ class SheetSync:
             return
 
         try:
-            credentials_dict = json.loads(settings.GOOGLE_SHEETS_CREDENTIALS_JSON)
+            credentials_dict = settings.google_credentials_info
             credentials = Credentials.from_service_account_info(
                 credentials_dict,
                 scopes=['https://www.googleapis.com/auth/spreadsheets']
@@ -82,40 +86,78 @@ class SheetSync:
             logger.error(f"Failed to fetch leads from sheet: {e}")
             return []
 
+    def _lead_row(self, lead_id: str) -> Optional[int]:
+        """Return the sheet row holding lead_id, from an index of the ID column.
+
+        The index is shared by the updates queued before the next flush and
+        rebuilt once on a miss, so leads added since it was read are found.
+        Rows can be inserted, deleted or sorted by hand between batches, so
+        the first update of each batch reads the ID column afresh.
+        """
+        if not self._pending_updates:
+            self._row_index = None
+        if self._row_index is None or lead_id not in self._row_index:
+            header = self.worksheet.row_values(1)
+            id_col = header.index("ID") + 1 if "ID" in header else 1
+            self._row_index = {
+                value: row for row, value in enumerate(self.worksheet.col_values(id_col), start=1)
+                if value
+            }
+        return self._row_index.get(lead_id)
+
     def update_lead_status(
         self,
         lead_id: str,
         status: str,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        flush: bool = True
     ) -> bool:
-        """Update lead status in the Google Sheet."""
+        """Update lead status in the Google Sheet.
+
+        With flush=False the write is only queued; call flush_updates() to
+        send all queued writes in one batch request.
+        """
         if not self.worksheet:
             logger.warning("Google Sheets worksheet not initialized")
             return False
 
         try:
             # Find the row with matching ID
-            cell = self.worksheet.find(lead_id)
-            if not cell:
+            row = self._lead_row(lead_id)
+            if not row:
                 logger.warning(f"Lead ID {lead_id} not found in sheet")
                 return False
 
-            # Update status and notes
-            row = cell.row
-            self.worksheet.update_cell(row, 5, status)  # Status column
+            # Status, Last Contact and Notes are adjacent columns (5-7), so
+            # write them as one dense range; Notes is left as-is when not given
+            values = [status, datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
             if notes:
-                self.worksheet.update_cell(row, 7, notes)  # Notes column
-            self.worksheet.update_cell(row, 6, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))  # Last Contact
+                values.append(notes)
+            cell_range = f"{rowcol_to_a1(row, 5)}:{rowcol_to_a1(row, 4 + len(values))}"
+            self._pending_updates.append({"range": cell_range, "values": [values]})
 
             # Also update in Supabase if available
             if get_supabase_client():
                 get_supabase_client().update_lead_status(lead_id, status, {"notes": notes})
 
-            return True
+            return self.flush_updates() if flush else True
         except Exception as e:
             logger.error(f"Failed to update lead status in sheet: {e}")
             return False
 
+    def flush_updates(self) -> bool:
+        """Write all queued lead updates to the sheet in one batch request."""
+        if not self._pending_updates:
+            return True
+
+        updates, self._pending_updates = self._pending_updates, []
+        try:
+            self.worksheet.batch_update(updates, value_input_option="USER_ENTERED")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write {len(updates)} lead updates to sheet: {e}")
+            return False
+
     def sync_broker_tone_settings(self) -> Dict[str, Any]:
         """Sync broker tone settings from a dedicated worksheet."""
         if not self.client or not settings.SHEET_ID:
@@ -172,38 +214,27 @@ scheduler = AsyncIOScheduler(
     timezone='UTC'
 )
 
-async def _sync_leads():
-    logging.info("Starting leads sync")
-    await get_google_sheets_service().upsert_leads()
-
-async def _sync_tones():
-    logging.info("Starting tones sync")
-    await get_google_sheets_service().upsert_tones()
-
-async def _sync_leads_wrapper():
-    """Wrapper to ensure the coroutine is properly awaited."""
-    await _sync_leads()
+async def _sync_sheets():
+    logging.info("Starting leads and tones sync")
+    service = get_google_sheets_service()
+    # One batchGet for both ranges; a range missing after a failed request
+    # is read on its own by its upsert
+    rows = await service.refresh_all()
+    await service.upsert_leads(rows.get("leads"))
+    await service.upsert_tones(rows.get("tones"))
 
-async def _sync_tones_wrapper():
+async def _sync_sheets_wrapper():
     """Wrapper to ensure the coroutine is properly awaited."""
-    await _sync_tones()
+    await _sync_sheets()
 
 def start_scheduler():
-    # Schedule leads sync at configured hour/minute
+    # Schedule the leads and tones sync at configured hour/minute
     scheduler.add_job(
-        _sync_leads_wrapper,
+        _sync_sheets_wrapper,
         "cron",
         hour=settings.SHEET_SYNC_HOUR,
         minute=settings.SHEET_SYNC_MINUTE,
-        id="sheet_sync_leads"
-    )
-    # Schedule tones sync offset by 5 minutes
-    scheduler.add_job(
-        _sync_tones_wrapper,
-        "cron",
-        hour=settings.SHEET_SYNC_HOUR,
-        minute=(settings.SHEET_SYNC_MINUTE + 5) % 60,
-        id="sheet_sync_tones"
+        id="sheet_sync"
     )
     scheduler.start()
     logging.info("Google Sheets sync scheduler started")
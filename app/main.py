@@ -1,48 +1,118 @@
+import asyncio
 import logging
-import sys
-from fastapi import FastAPI, HTTPException, Request, Response, Depends
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Tuple
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pythonjsonlogger import jsonlogger
-from prometheus_client import make_asgi_app, generate_latest, CONTENT_TYPE_LATEST
-from typing import Optional, Dict
-import json
-from datetime import datetime
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+import struct
+import time
+import msgpack
+import orjson
 from app.api import leads, messaging
 from app.services.config_manager import get_settings
 from app.services.supabase_client import get_supabase_client
-from app.jobs.sheet_sync import sheet_sync
-from fastapi.responses import JSONResponse
 from app.jobs.email_scheduler import start_email_scheduler, stop_email_scheduler
-from app.services.email_service import email_service, EmailService
-from app.services.kixie_handler import KixieHandler
-from app.services.google_sheets import GoogleSheetsService
+from app.services.email_service import get_email_service
+from app.services.kixie_handler import get_kixie_handler
 from app.jobs.scheduler_service import start_scheduler, is_healthy as scheduler_healthy
-from app.services.retry_logger import retry_logger
 from app.jobs.followup_service import followup_service
-from app.services.prometheus_metrics import collect_metrics
-import time
+from app.services.prometheus_metrics import make_metrics_app, start_metrics_server
+from app.core.middleware import ProfilingMiddleware, TimingMiddleware, get_request_timestamp
+from app.api.health_interceptor import HealthCheckInterceptor, cached_probe
 
 # Initialize settings
 settings = get_settings()
 
 # Configure JSON logging
 class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON.
+
+    Keys are written as pre-escaped byte fragments; only the message and
+    request_id go through orjson. Level, module and function names are
+    identifiers and need no escaping. format() runs under the handler lock,
+    so the buffer and the per-second timestamp prefix are reused across
+    records.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buf = bytearray()
+        self._ts_second = -1
+        self._ts_prefix = b""
+
+    def _timestamp(self, record) -> bytes:
+        """Return record.created as an ISO 8601 UTC timestamp with milliseconds."""
+        second = int(record.created)
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)).encode()
+        return self._ts_prefix + b".%03dZ" % int(record.msecs)
+
     def format(self, record):
-        log_record = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "module": record.module,
-            "function": record.funcName,
-            "line": record.lineno,
-        }
+        buf = self._buf
+        buf.clear()
+        buf += b'{"timestamp":"'
+        buf += self._timestamp(record)
+        buf += b'","level":"'
+        buf += record.levelname.encode()
+        buf += b'","message":'
+        buf += orjson.dumps(record.getMessage())
+        buf += b',"module":"'
+        buf += record.module.encode()
+        buf += b'","function":"'
+        buf += str(record.funcName).encode()
+        buf += b'","line":'
+        buf += str(record.lineno).encode()
         if hasattr(record, "request_id"):
-            log_record["request_id"] = record.request_id
-        return json.dumps(log_record)
+            buf += b',"request_id":'
+            buf += orjson.dumps(record.request_id, default=str)
+        buf += b"}"
+        return buf.decode()
+
+class BinaryLogHandler(logging.Handler):
+    """Write length-prefixed msgpack log records for an external log agent.
+
+    The message template and args are stored unformatted; the agent renders
+    them to text when the logs are read.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.stream = open(path, "ab")
+
+    def emit(self, record):
+        try:
+            log_record = {
+                "timestamp": record.created,
+                "level": record.levelname,
+                "msg": str(record.msg),
+                "args": record.args,
+                "module": record.module,
+                "function": record.funcName,
+                "line": record.lineno,
+            }
+            if hasattr(record, "request_id"):
+                log_record["request_id"] = record.request_id
+            payload = msgpack.packb(log_record, default=str)
+            self.stream.write(struct.pack(">I", len(payload)) + payload)
+            self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            super().close()
 
 # Set up logging globally
-handler = logging.StreamHandler()
-handler.setFormatter(JSONFormatter())
+if settings.LOG_FORMAT == "binary":
+    handler = BinaryLogHandler(settings.LOG_BINARY_PATH)
+else:
+    handler = logging.StreamHandler()
+    handler.setFormatter(JSONFormatter())
 root_logger = logging.getLogger()
 root_logger.addHandler(handler)
 root_logger.setLevel(logging.INFO)
@@ -50,80 +120,88 @@ root_logger.setLevel(logging.INFO)
 # Get module logger
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app with metadata
-app = FastAPI(
-    title="Lead Management API",
-    description="API for managing leads, communications, and analytics",
-    version="1.0.0"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Mount Prometheus metrics
-metrics_app = make_asgi_app()
-app.mount("/metrics", metrics_app)
-
-# Initialize services
-email_service = EmailService()
-kixie_handler = KixieHandler()
-sheets_service = GoogleSheetsService()
-
-# Include routers
-app.include_router(leads.router)
-app.include_router(messaging.router)
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup."""
-    try:
-        # Initialize Supabase client
+# Service health is checked in the background; probes only read the flags
+async def _health_loop(app: FastAPI):
+    """Refresh the app.state health flags every HEALTH_CHECK_INTERVAL seconds."""
+    while True:
         try:
-            get_supabase_client().initialize()
-            logger.info("Supabase client initialized successfully")
+            app.state.email_healthy = get_email_service().is_healthy()
         except Exception as e:
-            logger.exception("Failed to initialize Supabase client: %s", e)
-            raise
-
-        # Start email scheduler
+            logger.error(f"Email health check failed: {str(e)}")
+            app.state.email_healthy = False
         try:
-            start_email_scheduler()
-            logger.info("Email scheduler started")
+            app.state.scheduler_healthy = scheduler_healthy()
         except Exception as e:
-            logger.exception("Failed to start email scheduler: %s", e)
-            raise
-
-        # Start follow-up scheduler
+            logger.error(f"Scheduler health check failed: {str(e)}")
+            app.state.scheduler_healthy = False
         try:
-            start_scheduler()
-            logger.info("Follow-up scheduler started")
+            app.state.supabase_healthy = await get_supabase_client().is_connected()
         except Exception as e:
-            logger.exception("Failed to start follow-up scheduler: %s", e)
-            raise
+            logger.error(f"Supabase health probe failed: {str(e)}")
+            app.state.supabase_healthy = False
+        await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL)
+
+# Startup steps as (name, initializer, run_in_thread). Blocking network
+# setup runs in a worker thread; the schedulers bind to the running loop,
+# so they start on the loop thread while the threaded steps proceed.
+STARTUP_STEPS = [
+    ("Supabase client", lambda: get_supabase_client().initialize(), True),
+    ("Email service", get_email_service, False),
+    ("Kixie handler", get_kixie_handler, False),
+    ("Email scheduler", start_email_scheduler, False),
+    ("Follow-up scheduler", start_scheduler, False),
+    ("Metrics server", start_metrics_server, False),
+]
+
+async def _run_startup_step(initializer, run_in_thread: bool):
+    if run_in_thread:
+        return await asyncio.to_thread(initializer)
+    return initializer()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start services on startup and stop them on shutdown."""
+    try:
+        results = await asyncio.gather(
+            *(_run_startup_step(init, in_thread) for _, init, in_thread in STARTUP_STEPS),
+            return_exceptions=True
+        )
+        for (name, _, _), result in zip(STARTUP_STEPS, results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to start %s: %s", name, result, exc_info=result)
+                raise result
+            if result is not False:  # False: step skipped and logged why
+                logger.info("%s started", name)
+
+        # Start background health checks
+        app.state.email_healthy = False
+        app.state.scheduler_healthy = False
+        app.state.supabase_healthy = False
+        health_task = asyncio.create_task(_health_loop(app))
 
         logger.info("Application startup complete")
     except Exception as e:
         logger.exception("Startup failed: %s", e)
         raise
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown."""
+    yield
+
     try:
+        # Stop background health checks
+        health_task.cancel()
+
         # Close Kixie handler
-        await kixie_handler.close()
+        await get_kixie_handler().close()
         logger.info("Kixie handler closed")
 
         # Stop email scheduler
         stop_email_scheduler()
         logger.info("Email scheduler stopped")
 
+        # Write conversation records still buffered for the next bulk insert
+        await get_email_service()._flush_conversations()
+        logger.info("Conversation buffer flushed")
+
         # Stop follow-up scheduler
         if followup_service.scheduler.running:
             followup_service.scheduler.shutdown()
@@ -133,94 +211,122 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}")
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    try:
-        email_health = email_service.is_healthy()
-        scheduler_health = scheduler_healthy()
+# Initialize FastAPI app with metadata
+fastapi_app = FastAPI(
+    title="Lead Management API",
+    description="API for managing leads, communications, and analytics",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Add CORS middleware
+fastapi_app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
-        if not (email_health and scheduler_health):
-            raise HTTPException(status_code=503, detail="Service unhealthy")
+# Add request timing middleware
+fastapi_app.add_middleware(TimingMiddleware)
 
-        return {"status": "healthy"}
+# Compress larger responses; small bodies are sent as-is
+fastapi_app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
+# Profile requests that pass ?profile=1; opt-in, never mounted by default
+if settings.PROFILING:
+    fastapi_app.add_middleware(ProfilingMiddleware)
+
+# Include routers
+fastapi_app.include_router(leads.router)
+fastapi_app.include_router(messaging.router)
+
+def _json_probe(status: int, payload: Dict[str, Any]) -> Tuple[int, str, bytes]:
+    return status, "application/json", orjson.dumps(payload)
+
+@cached_probe(settings.PROBE_CACHE_TTL)
+def health_check() -> Tuple[int, str, bytes]:
+    """Health check probe."""
+    try:
+        state = fastapi_app.state
+        if not (getattr(state, "email_healthy", False) and getattr(state, "scheduler_healthy", False)):
+            raise RuntimeError("Service unhealthy")
+
+        return _json_probe(200, {"status": "healthy"})
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        raise HTTPException(status_code=503, detail=str(e))
+        return _json_probe(503, {"detail": str(e)})
 
-@app.get("/ready")
-async def readiness_check():
-    """Readiness check endpoint."""
+@cached_probe(settings.PROBE_CACHE_TTL)
+def readiness_check() -> Tuple[int, str, bytes]:
+    """Readiness check probe."""
     try:
         # Check if services are initialized
-        if not email_service.gmail_service:
+        if not get_email_service().gmail_service:
             logger.warning("Gmail service not initialized")
-            raise HTTPException(status_code=503, detail="Gmail service not initialized")
-
-        # Check if Supabase is connected
-        if not await get_supabase_client().is_connected():
-            logger.warning("Supabase not connected")
-            raise HTTPException(status_code=503, detail="Supabase not connected")
+            raise RuntimeError("Gmail service not initialized")
 
         # Check if scheduler is running
-        if not scheduler_healthy():
+        if not getattr(fastapi_app.state, "scheduler_healthy", False):
             logger.warning("Scheduler not healthy")
-            raise HTTPException(status_code=503, detail="Scheduler not healthy")
+            raise RuntimeError("Scheduler not healthy")
 
-        return {
+        # Check if Supabase is connected
+        if not getattr(fastapi_app.state, "supabase_healthy", False):
+            logger.warning("Supabase not connected")
+            raise RuntimeError("Supabase not connected")
+
+        return _json_probe(200, {
             "status": "ready",
             "services": {
                 "email": "initialized",
                 "supabase": "connected",
                 "scheduler": "running"
             }
-        }
+        })
     except Exception as e:
         logger.error(f"Readiness check failed: {str(e)}")
-        raise HTTPException(status_code=503, detail=str(e))
+        return _json_probe(503, {"detail": str(e)})
 
-@app.get("/metrics")
-async def metrics():
-    """Prometheus metrics endpoint."""
-    try:
-        # Collect and update metrics
-        collect_metrics()
+# Pre-serialized 500 body; only the timestamp is filled in per error
+_ERROR_BODY_PREFIX = b'{"detail":"Internal server error","timestamp":"'
+_ERROR_BODY_SUFFIX = b'"}'
 
-        # Return metrics in Prometheus format
-        return Response(
-            generate_latest(),
-            media_type=CONTENT_TYPE_LATEST
-        )
-    except Exception as e:
-        logger.error(f"Metrics collection failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.exception_handler(Exception)
+@fastapi_app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    body = _ERROR_BODY_PREFIX + get_request_timestamp().encode() + _ERROR_BODY_SUFFIX
+    return Response(
+        content=body,
         status_code=500,
-        content={
-            "detail": "Internal server error",
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        media_type="application/json"
     )
 
-# Request timing middleware
-@app.middleware("http")
-async def add_timing_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Probe and metrics endpoints are answered ahead of the middleware stack
+app = HealthCheckInterceptor(
+    fastapi_app,
+    {
+        "/health": health_check,
+        "/ready": readiness_check,
+    },
+    apps={"/metrics": make_metrics_app()}
+)
 
 if __name__ == "__main__":
     import uvicorn
+    # uvicorn ignores workers when reload is enabled, so only reload
+    # for single-process development runs. log_config=None keeps the JSON
+    # root handler configured above instead of uvicorn's default dictConfig.
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True
+        port=settings.PORT,
+        workers=settings.WORKERS,
+        loop="uvloop",
+        http="httptools",
+        log_config=None,
+        reload=settings.WORKERS == 1
     )
@@ -13,8 +13,3 @@ class Lead(BaseModel):
     last_contacted: Optional[datetime] = Field(None, description="Last follow-up attempt")
     status: str = Field(..., description="Current lead status")
     notes: Optional[str] = Field(None, description="Additional notes about the lead")
-
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
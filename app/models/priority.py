@@ -2,6 +2,8 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import logging
 from functools import lru_cache
+from dataclasses import dataclass
+import numpy as np
 from app.services.config_manager import get_settings, Settings
 from app.services.supabase_client import get_supabase_client
 
@@ -15,8 +17,61 @@ def get_weights() -> Dict[str, float]:
         "recency": settings.PRIORITY_RECENCY_WEIGHT,         # e.g. 0.5
         "engagement": settings.PRIORITY_ENGAGEMENT_WEIGHT,   # e.g. 0.3
         "classification": settings.PRIORITY_CLASS_WEIGHT,    # e.g. 0.2
+        "response_time": settings.PRIORITY_RESPONSE_TIME_WEIGHT,
+        "lead_source": settings.PRIORITY_LEAD_SOURCE_WEIGHT,
+        "interaction_frequency": settings.PRIORITY_INTERACTION_WEIGHT,
+        "lead_value": settings.PRIORITY_LEAD_VALUE_WEIGHT,
+        "time_since_last_contact": settings.PRIORITY_TIME_SINCE_CONTACT_WEIGHT,
     }
 
+@dataclass(slots=True, frozen=True)
+class _Consts:
+    """Scoring settings captured once at import for the per-lead hot paths."""
+    half_life_days: float
+    engagement_window_days: int
+    class_scores: Dict[str, float]
+    default_class_score: float
+
+_C = _Consts(
+    half_life_days=settings.PRIORITY_RECENCY_HALF_LIFE_DAYS,
+    engagement_window_days=settings.PRIORITY_ENGAGEMENT_WINDOW_DAYS,
+    class_scores=settings.PRIORITY_CLASS_SCORES,
+    default_class_score=settings.PRIORITY_CLASS_SCORES["default"],
+)
+
+# Lead source weights used by _get_source_score
+SOURCE_WEIGHTS = {
+    "referral": 1.0,
+    "website": 0.9,
+    "social": 0.8,
+    "email": 0.7,
+    "phone": 0.6,
+    "other": 0.5
+}
+
+# Step functions used by the response-time and time-since-contact scores:
+# ages (in hours) below each bin edge map to the score at the same index
+RESPONSE_AGE_BINS = np.array([1, 24, 72, 168])
+RESPONSE_AGE_SCORES = np.array([1.0, 0.8, 0.6, 0.4, 0.2])
+CONTACT_AGE_BINS = np.array([24, 72, 168, 336])
+CONTACT_AGE_SCORES = np.array([0.2, 0.4, 0.6, 0.8, 1.0])
+
+PRIORITY_VALUE_SCORES = {"High": 1.0, "Medium": 0.7, "Low": 0.4}
+
+@lru_cache(maxsize=8192)
+def _parse_iso(value: str) -> datetime:
+    """datetime.fromisoformat, cached; the same timestamps recur across re-scorings."""
+    return datetime.fromisoformat(value)
+
+def _age_hours(value: Optional[str], now: datetime) -> Optional[float]:
+    """Hours since an ISO timestamp; None if missing, NaN if unparsable."""
+    if not value:
+        return None
+    try:
+        return (now - _parse_iso(value)).total_seconds() / 3600
+    except Exception:
+        return float("nan")
+
 class PriorityScorer:
     def __init__(self):
         self.weights = get_weights()
@@ -25,31 +80,45 @@ class PriorityScorer:
         # more recent = higher score
         days = (datetime.utcnow() - last_contact).days
         # exponential decay
-        return max(0.0, 1.0 - (days / settings.PRIORITY_RECENCY_HALF_LIFE_DAYS))
+        return max(0.0, 1.0 - (days / _C.half_life_days))
 
-    def _engagement_score(self, lead_id: str) -> float:
+    def _engagement_score(
+        self,
+        lead_id: str,
+        conversations: Optional[List[Dict[str, Any]]] = None
+    ) -> float:
         # ratio of inbound to total messages in window
-        window = datetime.utcnow() - timedelta(days=settings.PRIORITY_ENGAGEMENT_WINDOW_DAYS)
-        convs = get_supabase_client().fetch_recent_conversations(lead_id, limit=1000)
-        inbound = sum(1 for m in convs if m["role"] == "inbound" and m["timestamp"] >= window.isoformat())
-        total   = sum(1 for m in convs if m["timestamp"] >= window.isoformat())
+        window = (datetime.utcnow() - timedelta(days=_C.engagement_window_days)).isoformat()
+        if conversations is None:
+            conversations = get_supabase_client().fetch_recent_conversations(lead_id, limit=1000)
+        convs = conversations
+        inbound = sum(1 for m in convs if m["role"] == "inbound" and m["timestamp"] >= window)
+        total   = sum(1 for m in convs if m["timestamp"] >= window)
         return (inbound / total) if total else 0.0
 
     def _classification_score(self, lead: Dict[str, Any]) -> float:
         # Simple mapping of lead.metadata['classification']
         cls = lead.get("metadata", {}).get("classification", "").lower()
-        return settings.PRIORITY_CLASS_SCORES.get(cls, settings.PRIORITY_CLASS_SCORES["default"])
+        return _C.class_scores.get(cls, _C.default_class_score)
 
-    def compute(self, lead: Dict[str, Any]) -> float:
+    def compute(
+        self,
+        lead: Dict[str, Any],
+        conversations: Optional[List[Dict[str, Any]]] = None
+    ) -> float:
+        """Score a lead; pass prefetched conversations (newest first) to skip Supabase calls."""
         # Fetch last contact timestamp
-        recent = get_supabase_client().fetch_recent_conversations(lead["id"], limit=1)
+        if conversations is None:
+            recent = get_supabase_client().fetch_recent_conversations(lead["id"], limit=1)
+        else:
+            recent = conversations[:1]
         if recent:
-            last_ts = datetime.fromisoformat(recent[0]["timestamp"])
+            last_ts = _parse_iso(recent[0]["timestamp"])
         else:
             # never contacted = highest recency urgency
-            last_ts = datetime.utcnow() - timedelta(days=settings.PRIORITY_RECENCY_HALF_LIFE_DAYS)
+            last_ts = datetime.utcnow() - timedelta(days=_C.half_life_days)
         r = self._recency_score(last_ts)
-        e = self._engagement_score(lead["id"])
+        e = self._engagement_score(lead["id"], conversations)
         c = self._classification_score(lead)
 
         score = (
@@ -59,13 +128,21 @@ class PriorityScorer:
         )
         return round(score, 4)
 
-    def calculate_priority_score(self, lead: Dict[str, Any]) -> float:
-        """Calculate priority score for a lead based on various factors."""
+    def calculate_priority_score(
+        self,
+        lead: Dict[str, Any],
+        conversations: Optional[List[Dict[str, Any]]] = None
+    ) -> float:
+        """Calculate priority score for a lead based on various factors.
+
+        Pass the lead's prefetched conversations to skip the Supabase lookup.
+        """
         try:
             score = 0.0
+            now = datetime.now()
 
             # Response time score (0-1)
-            response_time = self._get_response_time_score(lead)
+            response_time = self._get_response_time_score(lead, now)
             score += response_time * self.weights["response_time"]
 
             # Lead source score (0-1)
@@ -73,7 +150,7 @@ class PriorityScorer:
             score += source_score * self.weights["lead_source"]
 
             # Interaction frequency score (0-1)
-            interaction_score = self._get_interaction_score(lead)
+            interaction_score = self._get_interaction_score(lead, conversations)
             score += interaction_score * self.weights["interaction_frequency"]
 
             # Lead value score (0-1)
@@ -81,7 +158,7 @@ class PriorityScorer:
             score += value_score * self.weights["lead_value"]
 
             # Time since last contact score (0-1)
-            time_score = self._get_time_score(lead)
+            time_score = self._get_time_score(lead, now)
             score += time_score * self.weights["time_since_last_contact"]
 
             return min(max(score, 0.0), 1.0)  # Normalize to 0-1
@@ -89,15 +166,19 @@ class PriorityScorer:
             logger.error(f"Error calculating priority score: {e}")
             return 0.5  # Default to medium priority
 
-    def _get_response_time_score(self, lead: Dict[str, Any]) -> float:
+    def _get_response_time_score(
+        self,
+        lead: Dict[str, Any],
+        now: Optional[datetime] = None
+    ) -> float:
         """Calculate score based on lead's response time."""
         try:
             last_response = lead.get("last_response_time")
             if not last_response:
                 return 0.5  # Default score if no response time
 
-            response_time = datetime.fromisoformat(last_response)
-            time_diff = datetime.now() - response_time
+            response_time = _parse_iso(last_response)
+            time_diff = (now or datetime.now()) - response_time
 
             # Score decreases as time since last response increases
             if time_diff < timedelta(hours=1):
@@ -117,30 +198,24 @@ class PriorityScorer:
     def _get_source_score(self, lead: Dict[str, Any]) -> float:
         """Calculate score based on lead source."""
         source = lead.get("metadata", {}).get("source", "").lower()
+        return SOURCE_WEIGHTS.get(source, 0.5)
 
-        # Define source weights
-        source_weights = {
-            "referral": 1.0,
-            "website": 0.9,
-            "social": 0.8,
-            "email": 0.7,
-            "phone": 0.6,
-            "other": 0.5
-        }
-
-        return source_weights.get(source, 0.5)
-
-    def _get_interaction_score(self, lead: Dict[str, Any]) -> float:
+    def _get_interaction_score(
+        self,
+        lead: Dict[str, Any],
+        conversations: Optional[List[Dict[str, Any]]] = None
+    ) -> float:
         """Calculate score based on interaction frequency."""
         try:
-            if not get_supabase_client():
-                return 0.5
+            if conversations is None:
+                if not get_supabase_client():
+                    return 0.5
 
-            # Get conversation count from Supabase
-            conversations = get_supabase_client().fetch_recent_conversations(
-                lead_id=lead["id"],
-                limit=100  # Get last 100 conversations
-            )
+                # Get conversation count from Supabase
+                conversations = get_supabase_client().fetch_recent_conversations(
+                    lead_id=lead["id"],
+                    limit=100  # Get last 100 conversations
+                )
 
             # Score based on number of interactions
             count = len(conversations)
@@ -185,15 +260,19 @@ class PriorityScorer:
             logger.error(f"Error calculating value score: {e}")
             return 0.5
 
-    def _get_time_score(self, lead: Dict[str, Any]) -> float:
+    def _get_time_score(
+        self,
+        lead: Dict[str, Any],
+        now: Optional[datetime] = None
+    ) -> float:
         """Calculate score based on time since last contact."""
         try:
             last_contact = lead.get("last_contact")
             if not last_contact:
                 return 1.0  # High priority if never contacted
 
-            contact_time = datetime.fromisoformat(last_contact)
-            time_diff = datetime.now() - contact_time
+            contact_time = _parse_iso(last_contact)
+            time_diff = (now or datetime.now()) - contact_time
 
             # Score increases as time since last contact increases
             if time_diff < timedelta(hours=24):
@@ -210,28 +289,108 @@ class PriorityScorer:
             logger.error(f"Error calculating time score: {e}")
             return 0.5
 
+    def _get_value_scores(self, leads: List[Dict[str, Any]]) -> np.ndarray:
+        """Vectorized _get_value_score over a batch of leads."""
+        n = len(leads)
+        scores = np.empty(n)
+        totals = np.zeros(n)
+        numeric = np.zeros(n, dtype=bool)
+        for i, lead in enumerate(leads):
+            metadata = lead.get("metadata", {})
+            priority_score = PRIORITY_VALUE_SCORES.get(metadata.get("priority"))
+            if priority_score is not None:
+                scores[i] = priority_score
+                continue
+            try:
+                totals[i] = (
+                    metadata.get("budget", 0)
+                    + metadata.get("property_value", 0)
+                    + metadata.get("urgency", 0)
+                )
+                numeric[i] = True
+            except Exception:
+                scores[i] = 0.5
+        scores[numeric] = np.clip(totals[numeric] / 3 / 100, 0.0, 1.0)
+        return scores
+
+    def calculate_priority_scores(
+        self,
+        leads: List[Dict[str, Any]],
+        conversations: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    ) -> np.ndarray:
+        """Vectorized calculate_priority_score over a batch of leads.
+
+        ``conversations`` maps lead id to prefetched conversations, as
+        returned by SupabaseClient.fetch_recent_conversations_bulk.
+        """
+        now = datetime.now()
+
+        # Response time score: missing -> 0.5, unparsable -> 0.5
+        response_ages = np.array(
+            [_age_hours(lead.get("last_response_time"), now) for lead in leads],
+            dtype=float
+        )
+        response = RESPONSE_AGE_SCORES[np.digitize(np.nan_to_num(response_ages), RESPONSE_AGE_BINS)]
+        response[np.isnan(response_ages)] = 0.5
+
+        # Time since last contact score: missing -> 1.0, unparsable -> 0.5
+        contact_values = [_age_hours(lead.get("last_contact"), now) for lead in leads]
+        never_contacted = np.array([age is None for age in contact_values])
+        contact_ages = np.array(contact_values, dtype=float)
+        contact = CONTACT_AGE_SCORES[np.digitize(np.nan_to_num(contact_ages), CONTACT_AGE_BINS)]
+        contact[np.isnan(contact_ages)] = 0.5
+        contact[never_contacted] = 1.0
+
+        source = np.fromiter(
+            (self._get_source_score(lead) for lead in leads), dtype=float, count=len(leads)
+        )
+        interaction = np.fromiter(
+            (
+                self._get_interaction_score(
+                    lead,
+                    conversations.get(lead["id"], []) if conversations is not None else None
+                )
+                for lead in leads
+            ),
+            dtype=float,
+            count=len(leads)
+        )
+        value = self._get_value_scores(leads)
+
+        weights = np.array([
+            self.weights["response_time"],
+            self.weights["lead_source"],
+            self.weights["interaction_frequency"],
+            self.weights["lead_value"],
+            self.weights["time_since_last_contact"],
+        ])
+        scores = weights @ np.stack([response, source, interaction, value, contact])
+        return np.clip(scores, 0.0, 1.0)  # Normalize to 0-1
+
     def get_priority_batch(
         self,
         leads: List[Dict[str, Any]],
-        batch_size: int = 10
+        batch_size: int = 10,
+        conversations: Optional[Dict[str, List[Dict[str, Any]]]] = None
     ) -> List[Dict[str, Any]]:
         """Get a batch of leads sorted by priority score."""
         try:
-            # Calculate scores for all leads
-            scored_leads = [
-                {**lead, "priority_score": self.calculate_priority_score(lead)}
-                for lead in leads
-            ]
+            if not leads or batch_size <= 0:
+                return []
 
-            # Sort by priority score (descending)
-            sorted_leads = sorted(
-                scored_leads,
-                key=lambda x: x["priority_score"],
-                reverse=True
-            )
+            scores = self.calculate_priority_scores(leads, conversations)
 
-            # Return top N leads
-            return sorted_leads[:batch_size]
+            # Select the top N without sorting the whole batch, then order them
+            if batch_size < len(leads):
+                top = np.argpartition(-scores, batch_size - 1)[:batch_size]
+            else:
+                top = np.arange(len(leads))
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            return [
+                {**leads[i], "priority_score": float(scores[i])}
+                for i in top
+            ]
         except Exception as e:
             logger.error(f"Error getting priority batch: {e}")
             return leads[:batch_size]  # Return first N leads if error
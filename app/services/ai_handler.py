@@ -1,6 +1,7 @@
 import logging
 import openai
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 
 from app.services.config_manager import get_settings
@@ -27,14 +28,11 @@ async def _fetch_context(lead_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         logger.error(f"Failed to fetch context for lead {lead_id}: {e}")
         return []
 
-def _build_system_prompt(broker: Dict[str, Any]) -> str:
-    """Build the system prompt with broker's tone and examples."""
-    try:
-        tone = broker.get("tone_style", "professional")
-        examples = broker.get("examples", [])
-
-        # Base prompt with tone and examples
-        prompt = f"""
+@lru_cache(maxsize=256)
+def _system_prompt_for(tone: str, examples: Tuple[str, ...]) -> str:
+    """Render the system prompt for a tone and example set."""
+    # Base prompt with tone and examples
+    prompt = f"""
 You are a broker at Pure Financial Funding.
 Use a {tone} tone in every message.
 Here are examples of how you sound:
@@ -48,7 +46,15 @@ Guidelines:
 - Be strategic and value-focused
 - Personalize based on the lead's context
 """
-        return prompt.strip()
+    return prompt.strip()
+
+def _build_system_prompt(broker: Dict[str, Any]) -> str:
+    """Build the system prompt with broker's tone and examples."""
+    try:
+        # Keyed on content rather than broker id so tone edits are never stale
+        tone = broker.get("tone_style", "professional")
+        examples = tuple(broker.get("examples", []))
+        return _system_prompt_for(tone, examples)
     except Exception as e:
         logger.error(f"Failed to build system prompt: {e}")
         return "You are a professional broker at Pure Financial Funding. Keep messages concise and natural."
@@ -1,14 +1,16 @@
 from typing import Optional, List, Dict, Any
-from pydantic_settings import BaseSettings
-from pydantic import validator, EmailStr, HttpUrl, Field, model_validator
-import json
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import EmailStr, HttpUrl, Field, model_validator
+import orjson
 import logging
 import re
-from functools import lru_cache
+from functools import cached_property, lru_cache
 import os
 
 logger = logging.getLogger(__name__)
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class Settings(BaseSettings):
     # Environment
     ENV: str = "development"
@@ -26,6 +28,7 @@ class Settings(BaseSettings):
     # Supabase
     SUPABASE_URL: str
     SUPABASE_SERVICE_KEY: Optional[str] = None
+    SUPABASE_DB_URL: Optional[str] = None  # Direct Postgres URL for COPY bulk inserts
 
     # Google Sheets
     SHEET_ID: Optional[str] = None
@@ -35,6 +38,7 @@ class Settings(BaseSettings):
     TONE_SETTINGS_SHEET_NAME: str = Field(default="BrokerTones")
     GOOGLE_SHEETS_LEADS_RANGE: str = Field(default="A1:Z1000")
     GOOGLE_SHEETS_TONE_RANGE: str = Field(default="A1:Z100")
+    GOOGLE_SHEETS_CACHE_TTL: float = 60.0  # Seconds fetched rows are reused
 
     # Email Configuration
     EMAIL_SENDER: Optional[str] = None
@@ -43,6 +47,7 @@ class Settings(BaseSettings):
     EMAIL_BATCH_SIZE: int = 50
     EMAIL_BATCH_DELAY: int = 1
     EMAIL_QUEUE_ALERT_THRESHOLD: int = 1000
+    EMAIL_CONCURRENCY: int = 10
     EMAIL_PASSWORD: Optional[str] = None
     REPORT_EMAIL: Optional[str] = None
     SMTP_SERVER: str = "smtp.gmail.com"
@@ -64,6 +69,7 @@ class Settings(BaseSettings):
     # Core Infrastructure
     PORT: int = 8000
     PROMETHEUS_PORT: int = 8001
+    WORKERS: int = 1
 
     # JWT
     JWT_ALGORITHM: str = "HS256"
@@ -78,6 +84,17 @@ class Settings(BaseSettings):
     BUSINESS_HOURS_START: int = 9
     BUSINESS_HOURS_END: int = 17
 
+    # Logging
+    LOG_FORMAT: str = "json"  # "json" or "binary"
+    LOG_BINARY_PATH: str = "app.log.bin"
+
+    # Profiling
+    PROFILING: bool = False
+
+    # Health Checks
+    HEALTH_CHECK_INTERVAL: int = 5
+    PROBE_CACHE_TTL: float = 5.0
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
@@ -85,6 +102,7 @@ class Settings(BaseSettings):
     BATCH_SIZE: int = 100
     BATCH_DELAY: int = 1
     BATCH_CHUNK_SIZE: int = 500
+    BATCH_MAX_WORKERS: int = 4
     MAX_RETRIES: int = 3
 
     # Priority Scoring Settings
@@ -93,6 +111,11 @@ class Settings(BaseSettings):
     PRIORITY_CLASS_WEIGHT: float = 0.2
     PRIORITY_RECENCY_HALF_LIFE_DAYS: int = 7
     PRIORITY_ENGAGEMENT_WINDOW_DAYS: int = 14
+    PRIORITY_RESPONSE_TIME_WEIGHT: float = 0.25
+    PRIORITY_LEAD_SOURCE_WEIGHT: float = 0.15
+    PRIORITY_INTERACTION_WEIGHT: float = 0.2
+    PRIORITY_LEAD_VALUE_WEIGHT: float = 0.2
+    PRIORITY_TIME_SINCE_CONTACT_WEIGHT: float = 0.2
     PRIORITY_CLASS_SCORES: dict = {
         "hot": 1.0,
         "warm": 0.7,
@@ -103,39 +126,23 @@ class Settings(BaseSettings):
     # Followup Queue Alert Threshold
     FOLLOWUP_QUEUE_ALERT_THRESHOLD: int = 100
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
 
-    @validator("SHEET_ID")
-    def validate_sheet_id(cls, v):
-        if v and len(v) < 10:  # Only validate if value is provided
+    @model_validator(mode="after")
+    def validate_related_settings(self) -> 'Settings':
+        """Validate individual values and that related settings are consistent.
+
+        Optional values are only checked when provided.
+        """
+        if self.SHEET_ID and len(self.SHEET_ID) < 10:
             raise ValueError("SHEET_ID must be a valid Google Sheet ID")
-        return v
-
-    @validator("GMAIL_USER")
-    def validate_email_sender(cls, v):
-        if v:  # Only validate if value is provided
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, v):
-                raise ValueError("GMAIL_USER must be a valid email address")
-        return v
-
-    @validator("KIXIE_API_KEY")
-    def validate_kixie_key(cls, v):
-        if v and len(v) < 10:  # Only validate if value is provided
+        if self.GMAIL_USER and not _EMAIL_RE.match(self.GMAIL_USER):
+            raise ValueError("GMAIL_USER must be a valid email address")
+        if self.KIXIE_API_KEY and len(self.KIXIE_API_KEY) < 10:
             raise ValueError("KIXIE_API_KEY must be a valid API key")
-        return v
-
-    @validator("SUPABASE_URL")
-    def validate_supabase_url(cls, v):
-        if v and not v.startswith("https://"):  # Only validate if value is provided
+        if self.SUPABASE_URL and not self.SUPABASE_URL.startswith("https://"):
             raise ValueError("SUPABASE_URL must be a valid HTTPS URL")
-        return v
 
-    @model_validator(mode="after")
-    def validate_related_settings(self) -> 'Settings':
-        """Validate that related settings are consistent."""
         # If email features are enabled, ensure sender is set
         if self.EMAIL_PASSWORD and not self.GMAIL_USER:
             raise ValueError("GMAIL_USER must be set when EMAIL_PASSWORD is provided")
@@ -146,6 +153,12 @@ class Settings(BaseSettings):
 
         return self
 
+    @cached_property
+    def google_credentials_info(self) -> Optional[Dict[str, Any]]:
+        """Service-account info from GOOGLE_SHEETS_CREDENTIALS_JSON, parsed on first use."""
+        raw_json = self.GOOGLE_SHEETS_CREDENTIALS_JSON.strip()
+        return orjson.loads(raw_json) if raw_json else None
+
     def validate_optional_settings(self) -> None:
         """Validate optional settings and log warnings for missing values."""
         # Google Sheets
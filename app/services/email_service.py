@@ -1,18 +1,23 @@
 import logging
 import asyncio
-from datetime import datetime, time
-from typing import Dict, Any, List, Optional, Tuple
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import base64
+import math
+import orjson
+from time import monotonic
+from datetime import datetime, time, timedelta
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
+from email.message import EmailMessage
+from email.policy import SMTP
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-import json
 import os
 import smtplib
+from functools import lru_cache
 from app.services.config_manager import get_settings
 from app.services.supabase_client import get_supabase_client
 from app.services.retry_logger import with_retry_logging, retry_logger
@@ -20,12 +25,156 @@ from app.services.retry_logger import with_retry_logging, retry_logger
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Initialize Jinja2 environment
+# Gmail accepts at most 100 calls per HTTP batch request
+GMAIL_BATCH_LIMIT = 100
+
+# Most conversation records written to Supabase in one insert
+CONVERSATION_FLUSH_LIMIT = 500
+
+def _hours_mask(weekdays: range) -> int:
+    """Bitmask with bit weekday * 24 + hour set for each sending hour of weekdays."""
+    mask = 0
+    for weekday in weekdays:
+        for hour in range(settings.EMAIL_START_HOUR, settings.EMAIL_END_HOUR + 1):
+            mask |= 1 << (weekday * 24 + hour)
+    return mask
+
+# Sending hours as 7x24 bitmasks: scheduled sends only go out Mon-Fri,
+# while is_within_business_hours() applies the hours on any day
+_WEEKDAY_HOURS_MASK = _hours_mask(range(5))
+_DAILY_HOURS_MASK = _hours_mask(range(7))
+
+# Messages are built with CRLF line endings and RFC 2047 encoded headers;
+# a 7bit body encoding sends non-ASCII content as quoted-printable or base64
+_MESSAGE_POLICY = SMTP.clone(cte_type="7bit")
+
+# Stand-in To address for bulk message skeletons, swapped per recipient
+_RECIPIENT_PLACEHOLDER = "bulk-recipient@placeholder.invalid"
+_PLACEHOLDER_TO_HEADER = f"To: {_RECIPIENT_PLACEHOLDER}\r\n".encode("ascii")
+
+# Initialize Jinja2 environment. Templates ship with the image, so skip the
+# per-render freshness check and share compiled bytecode across workers.
 env = Environment(
     loader=FileSystemLoader("app/templates/email"),
-    autoescape=select_autoescape(["html", "xml"])
+    autoescape=select_autoescape(["html", "xml"]),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False
 )
 
+# Compiled templates by name (without .html); filled by EmailService at startup
+_templates: Dict[str, Template] = {}
+
+def _get_template(template_name: str) -> Template:
+    template = _templates.get(template_name)
+    if template is None:
+        template = _templates[template_name] = env.get_template(f"{template_name}.html")
+    return template
+
+@lru_cache(maxsize=256)
+def _render_cached(template_name: str, data_key: bytes) -> str:
+    return _get_template(template_name).render(**orjson.loads(data_key))
+
+_JSON_SCALARS = (str, int, bool, type(None))
+
+def _json_native(value: Any) -> bool:
+    """True if value is built only from JSON types, so a JSON round trip leaves it unchanged."""
+    kind = type(value)
+    if kind in _JSON_SCALARS:
+        return True
+    if kind is float:
+        return math.isfinite(value)  # NaN and infinities encode as null
+    if kind is list:
+        return all(_json_native(item) for item in value)
+    if kind is dict:
+        return all(type(k) is str and _json_native(v) for k, v in value.items())
+    return False
+
+def render_template(template_name: str, template_data: Dict[str, Any]) -> str:
+    """Render an email template, reusing output for identical data.
+
+    Bulk sends often render the same template with the same variables, so
+    results are memoized by the data's JSON encoding. Keys are not sorted,
+    since templates can iterate dicts in insertion order. Only data built
+    from plain JSON types is cached; anything else (tuples, enums,
+    datetimes, custom objects) would render differently after a JSON round
+    trip and is rendered directly.
+    """
+    if _json_native(template_data):
+        try:
+            return _render_cached(template_name, orjson.dumps(template_data))
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers wider than 64 bits
+    return _get_template(template_name).render(**template_data)
+
+class TokenBucket:
+    """Async rate limiter allowing `rate` acquisitions per `period` seconds.
+
+    Unlike a semaphore this bounds throughput, not concurrency; up to `rate`
+    acquisitions may burst at once after an idle period.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = float(max(1, rate))
+        self.tokens = self.capacity
+        self.fill_rate = self.capacity / period
+        self.updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """Wait until `tokens` acquisitions are available and take them."""
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {int(self.capacity)}")
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self.updated is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.fill_rate)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+class AdaptiveBackoff:
+    """Retry delay scaled by the send failure ratio over a sliding window.
+
+    With no recent failures retries go out almost immediately; as the ratio
+    approaches 1 the delay approaches plain exponential backoff, capped at
+    max_delay. With no recent data the full exponential delay is used.
+    """
+
+    def __init__(self, base_delay: float, max_delay: float = 60.0, window: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.window = window
+        self._results: Deque[Tuple[float, bool]] = deque()
+
+    def _trim(self, now: float) -> None:
+        while self._results and now - self._results[0][0] > self.window:
+            self._results.popleft()
+
+    def record(self, ok: bool) -> None:
+        now = monotonic()
+        self._results.append((now, ok))
+        self._trim(now)
+
+    def failure_ratio(self) -> float:
+        self._trim(monotonic())
+        if not self._results:
+            return 1.0
+        return sum(1 for _, ok in self._results if not ok) / len(self._results)
+
+    def delay(self, retry_count: int) -> float:
+        full = min(self.max_delay, self.base_delay * (2 ** retry_count))
+        return full * self.failure_ratio()
+
 class EmailMetrics:
     """Track email sending metrics."""
     def __init__(self):
@@ -54,18 +203,23 @@ class EmailMetrics:
 class EmailService:
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
-        self.email_queue: List[Dict[str, Any]] = []
-        self.retry_queue: List[Dict[str, Any]] = []  # Queue for failed sends
+        self.email_queue: Deque[Dict[str, Any]] = deque()
+        self.retry_queue: Deque[Dict[str, Any]] = deque()  # Queue for failed sends
         self.metrics = EmailMetrics()
-        self._setup_scheduler()
-        self._initialize_gmail_service()
-        self._rate_limiter = asyncio.Semaphore(settings.RATE_LIMIT_PER_MINUTE)
+        # Sent-email conversation records awaiting a bulk insert
+        self._conv_buffer: Deque[Dict[str, Any]] = deque()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._rate_limiter = TokenBucket(settings.RATE_LIMIT_PER_MINUTE, 60.0)
         self._max_retries = 3  # Maximum number of retry attempts
         self._base_delay = 1  # Base delay in seconds for exponential backoff
+        self._backoff = AdaptiveBackoff(self._base_delay)
         self.smtp_server = "smtp.gmail.com"
         self.smtp_port = 587
         self.sender_email = settings.EMAIL_SENDER
         self.gmail_service = None
+        self._setup_scheduler()
+        self._initialize_gmail_service()
+        self._preload_templates()
 
     def _initialize_gmail_service(self):
         """Initialize Gmail API service."""
@@ -74,7 +228,7 @@ class EmailService:
                 logger.warning("No Gmail credentials provided, email service will be disabled")
                 return
 
-            credentials_json = json.loads(settings.GOOGLE_SHEETS_CREDENTIALS_JSON)
+            credentials_json = settings.google_credentials_info
             credentials = service_account.Credentials.from_service_account_info(
                 credentials_json,
                 scopes=['https://www.googleapis.com/auth/gmail.send']
@@ -85,6 +239,14 @@ class EmailService:
             logger.error(f"Failed to initialize Gmail service: {e}")
             self.gmail_service = None
 
+    def _preload_templates(self):
+        """Compile all email templates up front so the first sends don't pay for it."""
+        for name in env.list_templates(extensions=["html"]):
+            try:
+                _get_template(name[:-len(".html")])
+            except Exception as e:
+                logger.error(f"Failed to load email template {name}: {e}")
+
     def _setup_scheduler(self):
         """Configure the scheduler for batch email processing."""
         # Run every hour during business hours
@@ -105,6 +267,13 @@ class EmailService:
             id="email_retry_processor"
         )
 
+        # Flush buffered conversation records every 5 seconds
+        self.scheduler.add_job(
+            self._flush_conversations,
+            CronTrigger(second="*/5"),
+            id="conversation_flusher"
+        )
+
         # Update metrics every minute
         self.scheduler.add_job(
             self._update_metrics,
@@ -115,6 +284,22 @@ class EmailService:
         self.scheduler.start()
         logger.info("Email scheduler started")
 
+    async def _flush_conversations(self):
+        """Insert buffered conversation records, CONVERSATION_FLUSH_LIMIT rows per request."""
+        buffer = self._conv_buffer
+        while buffer:
+            batch = [buffer.popleft() for _ in range(min(len(buffer), CONVERSATION_FLUSH_LIMIT))]
+            inserted = await get_supabase_client().insert_conversations_bulk(batch)
+            logger.debug(f"Logged {inserted}/{len(batch)} sent emails to Supabase")
+
+    def _buffer_conversation(self, record: Dict[str, Any]):
+        """Queue a conversation record, flushing early once a full insert is buffered."""
+        self._conv_buffer.append(record)
+        if len(self._conv_buffer) >= CONVERSATION_FLUSH_LIMIT and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_conversations())
+
     def _update_metrics(self):
         """Update current metrics."""
         self.metrics.current_queue_size = len(self.email_queue)
@@ -122,61 +307,102 @@ class EmailService:
         logger.debug(f"Updated metrics: {self.metrics.to_dict()}")
 
     async def _process_email_queue(self):
-        """Process queued emails during business hours."""
+        """Process queued emails during business hours, EMAIL_CONCURRENCY at a time."""
         if not self.email_queue:
             return
 
-        logger.info(f"Processing {len(self.email_queue)} queued emails")
-        for email_data in self.email_queue[:]:
-            try:
-                await self.send_email(**email_data)
-                self.email_queue.remove(email_data)
-            except Exception as e:
-                logger.error(f"Failed to process queued email: {e}")
+        # Take the emails queued so far; anything queued meanwhile waits for the next run
+        queue = self.email_queue
+        snapshot = [queue.popleft() for _ in range(len(queue))]
+        logger.info(f"Processing {len(snapshot)} queued emails")
+        slots = asyncio.Semaphore(settings.EMAIL_CONCURRENCY)
+
+        async def send_queued(email_data: Dict[str, Any]) -> bool:
+            async with slots:
+                return await self.send_email(**email_data)
+
+        results = await asyncio.gather(*(send_queued(e) for e in snapshot), return_exceptions=True)
+
+        # Failed sends were already moved to the retry queue by send_email;
+        # only emails whose processing raised go back on the queue.
+        for email_data, result in zip(snapshot, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to process queued email: {result}")
+                queue.append(email_data)
 
     async def _process_retry_queue(self):
-        """Process retry queue with exponential backoff."""
+        """Retry emails whose backoff has elapsed, EMAIL_CONCURRENCY at a time.
+
+        Each entry carries the monotonic time of its next attempt, so a pass
+        never sleeps: due entries are sent earliest deadline first, and the
+        rest stay queued for a later pass.
+        """
         if not self.retry_queue:
             return
 
-        logger.info(f"Processing {len(self.retry_queue)} retry emails")
-        for retry_data in self.retry_queue[:]:
-            try:
-                # Calculate exponential backoff delay
-                retry_count = retry_data.get('retry_count', 0)
-                delay = self._base_delay * (2 ** retry_count)
+        queue = self.retry_queue
+        now = monotonic()
+        snapshot: List[Dict[str, Any]] = []
+        for _ in range(len(queue)):
+            retry_data = queue.popleft()
+            if retry_data.get('next_attempt_at', 0.0) <= now:
+                snapshot.append(retry_data)
+            else:
+                queue.append(retry_data)
+        if not snapshot:
+            return
+
+        snapshot.sort(key=lambda r: r.get('next_attempt_at', 0.0))
+        logger.info(f"Processing {len(snapshot)} retry emails")
+        slots = asyncio.Semaphore(settings.EMAIL_CONCURRENCY)
 
-                # Wait for the calculated delay
-                await asyncio.sleep(delay)
+        async def retry(retry_data: Dict[str, Any]) -> bool:
+            async with slots:
+                return await self.send_email(**retry_data['email_data'])
 
-                # Attempt to send again
-                success = await self.send_email(**retry_data['email_data'])
+        results = await asyncio.gather(*(retry(r) for r in snapshot), return_exceptions=True)
 
-                if success:
-                    self.retry_queue.remove(retry_data)
-                    logger.info(f"Successfully sent retry email to {retry_data['email_data']['to']}")
+        for retry_data, result in zip(snapshot, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to process retry email: {result}")
+                queue.append(retry_data)
+            elif result:
+                logger.info(f"Successfully sent retry email to {retry_data['email_data']['to']}")
+            else:
+                # Update retry count and requeue until max retries reached
+                retry_count = retry_data.get('retry_count', 0)
+                retry_data['retry_count'] = retry_count + 1
+                if retry_count + 1 >= self._max_retries:
+                    logger.error(f"Max retries reached for email to {retry_data['email_data']['to']}")
                 else:
-                    # Update retry count and remove if max retries reached
-                    retry_data['retry_count'] = retry_count + 1
-                    if retry_count + 1 >= self._max_retries:
-                        self.retry_queue.remove(retry_data)
-                        logger.error(f"Max retries reached for email to {retry_data['email_data']['to']}")
-            except Exception as e:
-                logger.error(f"Failed to process retry email: {e}")
+                    retry_data['next_attempt_at'] = monotonic() + self._backoff.delay(retry_count + 1)
+                    queue.append(retry_data)
 
     def get_queue_status(self) -> Dict[str, Any]:
         """Get current status of email queues and metrics."""
+        now = datetime.now()
+        next_retry_time = None
+        if self.retry_queue:
+            # Retries run at each quarter hour
+            next_retry_time = (
+                now.replace(minute=0, second=0, microsecond=0)
+                + timedelta(minutes=15 * (now.minute // 15 + 1))
+            ).isoformat()
         return {
             "metrics": self.metrics.to_dict(),
             "queue_size": len(self.email_queue),
             "retry_queue_size": len(self.retry_queue),
-            "next_retry_time": datetime.now().replace(minute=15 * (datetime.now().minute // 15 + 1), second=0, microsecond=0).isoformat() if self.retry_queue else None,
-            "is_business_hours": (
-                settings.EMAIL_START_HOUR <= datetime.now().hour <= settings.EMAIL_END_HOUR
-                and datetime.now().weekday() < 5
-            )
+            "next_retry_time": next_retry_time,
+            "is_business_hours": self._is_business_hours(now)
         }
 
+    @staticmethod
+    def _is_business_hours(now: Optional[datetime] = None) -> bool:
+        """Whether scheduled emails may be sent at now (Mon-Fri, configured hours)."""
+        if now is None:
+            now = datetime.now()
+        return bool(_WEEKDAY_HOURS_MASK >> (now.weekday() * 24 + now.hour) & 1)
+
     def _create_message(
         self,
         to: str,
@@ -184,25 +410,120 @@ class EmailService:
         template_name: Optional[str] = None,
         template_data: Optional[Dict[str, Any]] = None,
         body: Optional[str] = None
-    ) -> MIMEMultipart:
+    ) -> EmailMessage:
         """Create an email message with optional templating."""
-        msg = MIMEMultipart("alternative")
+        content, subtype = self._message_content(template_name, template_data, body)
+        return self._build_message(to, subject, content, subtype)
+
+    @staticmethod
+    def _message_content(
+        template_name: Optional[str],
+        template_data: Optional[Dict[str, Any]],
+        body: Optional[str]
+    ) -> Tuple[str, str]:
+        """Return the (content, MIME subtype) of a message body."""
+        if template_name and template_data:
+            return render_template(template_name, template_data), "html"
+        if body:
+            return body, "plain"
+        raise ValueError("Either template_name/template_data or body must be provided")
+
+    def _build_message(self, to: str, subject: str, content: str, subtype: str) -> EmailMessage:
+        msg = EmailMessage(policy=_MESSAGE_POLICY)
         msg["Subject"] = subject
-        msg["From"] = self.sender_email
+        if self.sender_email:
+            # The SMTP policy can't serialize an empty header; Gmail fills in From
+            msg["From"] = self.sender_email
         msg["To"] = to
+        msg["MIME-Version"] = "1.0"
+        msg.add_alternative(content, subtype=subtype)
+        return msg
 
-        if template_name and template_data:
-            template = env.get_template(f"{template_name}.html")
-            html_content = template.render(**template_data)
-            msg.attach(MIMEText(html_content, "html"))
-        elif body:
-            msg.attach(MIMEText(body, "plain"))
-        else:
-            raise ValueError("Either template_name/template_data or body must be provided")
+    @staticmethod
+    def _raw_message(msg: EmailMessage) -> str:
+        """Encode a message as the base64url 'raw' field the Gmail API expects.
 
-        return msg
+        The message policy serializes with CRLF line endings directly, so the
+        message is flattened once with no newline rewriting afterwards.
+        """
+        return base64.urlsafe_b64encode(msg.as_bytes()).decode("ascii")
+
+    def _bulk_raw_message(
+        self,
+        to: str,
+        subject: str,
+        template_name: Optional[str],
+        template_data: Optional[Dict[str, Any]],
+        body: Optional[str],
+        skeletons: Dict[Tuple[str, str], bytes]
+    ) -> str:
+        """Encode a bulk message, reusing serialized messages with the same body.
+
+        Recipients sharing a body get the same serialized bytes with only the
+        To address swapped, so MIME assembly runs once per distinct body.
+        """
+        content, subtype = self._message_content(template_name, template_data, body)
+        to_header = _MESSAGE_POLICY.header_factory("To", to).fold(policy=_MESSAGE_POLICY)
+        if to_header != f"To: {to}\r\n":
+            # Non-ASCII names and long addresses are encoded or folded;
+            # build those messages normally
+            return self._raw_message(self._build_message(to, subject, content, subtype))
+
+        key = (content, subtype)
+        skeleton = skeletons.get(key)
+        if skeleton is None:
+            msg = self._build_message(_RECIPIENT_PLACEHOLDER, subject, content, subtype)
+            skeleton = skeletons[key] = msg.as_bytes()
+        raw = skeleton.replace(_PLACEHOLDER_TO_HEADER, to_header.encode("ascii"), 1)
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    async def _send_batch_via_gmail(
+        self,
+        raws: List[str]
+    ) -> List[Tuple[bool, Optional[str], Optional[str]]]:
+        """Send up to GMAIL_BATCH_LIMIT encoded messages in one HTTP batch request.
 
-    async def _send_via_gmail(self, msg: MIMEMultipart) -> Tuple[bool, Optional[str], Optional[str]]:
+        Returns a (success, message_id, error) tuple per message, in order.
+        """
+        if not self.gmail_service:
+            logger.warning("Gmail service not initialized. Emails not sent.")
+            return [(False, None, "Gmail service not initialized")] * len(raws)
+
+        results: List[Tuple[bool, Optional[str], Optional[str]]] = [
+            (False, None, "No response in Gmail batch")
+        ] * len(raws)
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                error_msg = f"Gmail API error: {exception}"
+                logger.error(error_msg)
+                self.metrics.last_error_time = datetime.now()
+                self.metrics.last_error_message = error_msg
+                results[int(request_id)] = (False, None, error_msg)
+            else:
+                results[int(request_id)] = (True, response["id"], None)
+
+        # The rate limit counts messages, not HTTP requests
+        await self._rate_limiter.acquire(len(raws))
+        try:
+            batch = self.gmail_service.new_batch_http_request(callback=on_response)
+            messages = self.gmail_service.users().messages()
+            for i, raw in enumerate(raws):
+                batch.add(
+                    messages.send(userId='me', body={'raw': raw}),
+                    request_id=str(i)
+                )
+            await asyncio.to_thread(batch.execute)
+        except Exception as e:
+            error_msg = f"Gmail batch error: {e}"
+            logger.error(error_msg)
+            self.metrics.last_error_time = datetime.now()
+            self.metrics.last_error_message = error_msg
+            return [(False, None, error_msg)] * len(raws)
+
+        return results
+
+    async def _send_via_gmail(self, msg: EmailMessage) -> Tuple[bool, Optional[str], Optional[str]]:
         """Send email via Gmail API with rate limiting and error handling."""
         if not self.gmail_service:
             logger.warning("Gmail service not initialized. Email not sent.")
@@ -210,16 +531,12 @@ class EmailService:
 
         async with self._rate_limiter:
             try:
-                # Convert to raw message
-                raw_message = msg.as_bytes()
-                raw_message = raw_message.decode('utf-8')
-                raw_message = raw_message.replace('\n', '\r\n').encode('utf-8')
-
-                # Send via Gmail API
-                message = self.gmail_service.users().messages().send(
+                # Send via Gmail API; execute() is a blocking HTTP call
+                request = self.gmail_service.users().messages().send(
                     userId='me',
-                    body={'raw': raw_message}
-                ).execute()
+                    body={'raw': self._raw_message(msg)}
+                )
+                message = await asyncio.to_thread(request.execute)
 
                 return True, message['id'], None
             except HttpError as e:
@@ -263,11 +580,7 @@ class EmailService:
         """
         try:
             # Check if we should queue the email
-            current_hour = datetime.now().hour
-            if schedule and not (
-                settings.EMAIL_START_HOUR <= current_hour <= settings.EMAIL_END_HOUR
-                and datetime.now().weekday() < 5  # Mon-Fri
-            ):
+            if schedule and not self._is_business_hours():
                 self.email_queue.append({
                     "to": to,
                     "subject": subject,
@@ -289,49 +602,10 @@ class EmailService:
 
             # Send via Gmail API
             success, message_id, error = await self._send_via_gmail(msg)
-            if not success:
-                # Add to retry queue if not at max retries
-                if retry_count < self._max_retries:
-                    self.retry_queue.append({
-                        'email_data': {
-                            'to': to,
-                            'subject': subject,
-                            'template_name': template_name,
-                            'template_data': template_data,
-                            'body': body,
-                            'schedule': schedule,
-                            'retry_count': retry_count + 1
-                        },
-                        'retry_count': retry_count
-                    })
-                    self.metrics.total_retried += 1
-                    logger.info(f"Added email to retry queue for {to}")
-                else:
-                    self.metrics.total_failed += 1
-                    logger.error(f"Failed to send email to {to} after {retry_count} retries: {error}")
-                return False
-
-            # Update metrics
-            self.metrics.total_sent += 1
-            self.metrics.last_success_time = datetime.now()
-
-            # Log to Supabase if available
-            if get_supabase_client() and template_data and "lead_id" in template_data:
-                get_supabase_client().insert_conversation(
-                    lead_id=template_data["lead_id"],
-                    message=f"Email sent: {subject}",
-                    direction="outbound",
-                    status="sent",
-                    metadata={
-                        "email_subject": subject,
-                        "template": template_name,
-                        "message_id": message_id,
-                        **template_data
-                    }
-                )
-
-            logger.info(f"Email sent to {to} (message_id: {message_id})")
-            return True
+            return self._record_send_result(
+                to, subject, template_name, template_data, body, schedule, retry_count,
+                success, message_id, error
+            )
 
         except Exception as e:
             self.metrics.total_failed += 1
@@ -340,6 +614,108 @@ class EmailService:
             logger.error(f"Failed to send email to {to}: {e}")
             return False
 
+    def _record_send_result(
+        self,
+        to: str,
+        subject: str,
+        template_name: Optional[str],
+        template_data: Optional[Dict[str, Any]],
+        body: Optional[str],
+        schedule: bool,
+        retry_count: int,
+        success: bool,
+        message_id: Optional[str],
+        error: Optional[str]
+    ) -> bool:
+        """Update queues, metrics and conversation log after a send attempt."""
+        self._backoff.record(success)
+        if not success:
+            # Add to retry queue if not at max retries
+            if retry_count < self._max_retries:
+                self.retry_queue.append({
+                    'email_data': {
+                        'to': to,
+                        'subject': subject,
+                        'template_name': template_name,
+                        'template_data': template_data,
+                        'body': body,
+                        'schedule': schedule,
+                        'retry_count': retry_count + 1
+                    },
+                    'retry_count': retry_count,
+                    # Exponential backoff, scaled by the recent failure ratio
+                    'next_attempt_at': monotonic() + self._backoff.delay(retry_count)
+                })
+                self.metrics.total_retried += 1
+                logger.info(f"Added email to retry queue for {to}")
+            else:
+                self.metrics.total_failed += 1
+                logger.error(f"Failed to send email to {to} after {retry_count} retries: {error}")
+            return False
+
+        # Update metrics
+        self.metrics.total_sent += 1
+        self.metrics.last_success_time = datetime.now()
+
+        # Log to Supabase in the next bulk flush
+        if template_data and "lead_id" in template_data:
+            self._buffer_conversation({
+                "lead_id": template_data["lead_id"],
+                "message": f"Email sent: {subject}",
+                "direction": "outbound",
+                "status": "sent",
+                "metadata": {
+                    "email_subject": subject,
+                    "template": template_name,
+                    "message_id": message_id,
+                    **template_data
+                },
+                "created_at": datetime.utcnow().isoformat()
+            })
+
+        logger.info(f"Email sent to {to} (message_id: {message_id})")
+        return True
+
+    async def _send_batch(
+        self,
+        recipients: List[Dict[str, Any]],
+        batch_data: List[Optional[Dict[str, Any]]],
+        subject: str,
+        template_name: Optional[str],
+        body: Optional[str]
+    ) -> List[Any]:
+        """Send one bulk batch through a single Gmail batch request.
+
+        Returns one result per recipient: True/False, or the exception raised
+        while building or recording that recipient's message.
+        """
+        results: List[Any] = [False] * len(recipients)
+        raws: List[str] = []
+        pending: List[int] = []
+        skeletons: Dict[Tuple[str, str], bytes] = {}
+        for i, (recipient, data) in enumerate(zip(recipients, batch_data)):
+            try:
+                raws.append(self._bulk_raw_message(
+                    recipient["email"], subject, template_name, data, body, skeletons
+                ))
+                pending.append(i)
+            except Exception as e:
+                self.metrics.total_failed += 1
+                logger.error(f"Failed to build email to {recipient.get('email')}: {e}")
+                results[i] = e
+
+        send_results = await self._send_batch_via_gmail(raws) if raws else []
+        for i, (success, message_id, error) in zip(pending, send_results):
+            try:
+                results[i] = self._record_send_result(
+                    recipients[i]["email"], subject, template_name, batch_data[i], body,
+                    True, 0, success, message_id, error
+                )
+            except Exception as e:
+                logger.error(f"Failed to record email to {recipients[i]['email']}: {e}")
+                results[i] = e
+        return results
+
     async def send_bulk_emails(
         self,
         recipients: List[Dict[str, Any]],
@@ -364,30 +740,40 @@ class EmailService:
             Dict with success and failure counts
         """
         results = {"success": 0, "failure": 0}
+        # Each batch goes out as a single Gmail HTTP batch request, and must
+        # fit in the rate limiter's bucket to be admitted
+        batch_size = min(batch_size, GMAIL_BATCH_LIMIT, int(self._rate_limiter.capacity))
 
         for i in range(0, len(recipients), batch_size):
             batch = recipients[i:i + batch_size]
-            tasks = []
 
-            for recipient in batch:
-                # Merge recipient-specific data with base template data
-                merged_data = {
+            # Merge recipient-specific data with base template data
+            batch_data = [
+                {
                     **(template_data or {}),
                     **(recipient.get("data", {}))
                 } if template_data else recipient.get("data")
-
-                task = self.send_email(
-                    to=recipient["email"],
-                    subject=subject,
-                    template_name=template_name,
-                    template_data=merged_data,
-                    body=body,
-                    schedule=True  # Always schedule bulk sends
+                for recipient in batch
+            ]
+
+            if self._is_business_hours():
+                batch_results = await self._send_batch(batch, batch_data, subject, template_name, body)
+            else:
+                # Outside business hours send_email queues each message
+                batch_results = await asyncio.gather(
+                    *(
+                        self.send_email(
+                            to=recipient["email"],
+                            subject=subject,
+                            template_name=template_name,
+                            template_data=merged_data,
+                            body=body,
+                            schedule=True  # Always schedule bulk sends
+                        )
+                        for recipient, merged_data in zip(batch, batch_data)
+                    ),
+                    return_exceptions=True
                 )
-                tasks.append(task)
-
-            # Wait for batch to complete
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
 
             # Count successes and failures
             for result in batch_results:
@@ -431,10 +817,8 @@ class EmailService:
 
     def is_within_business_hours(self) -> bool:
         """Check if current time is within business hours."""
-        current_time = datetime.now().time()
-        return (
-            settings.EMAIL_START_HOUR <= current_time.hour <= settings.EMAIL_END_HOUR
-        )
+        now = datetime.now()
+        return bool(_DAILY_HOURS_MASK >> (now.weekday() * 24 + now.hour) & 1)
 
     async def schedule_email(
         self,
@@ -461,5 +845,17 @@ class EmailService:
             "retry_stats": retry_logger.get_stats()
         }
 
-# Initialize singleton instance
-email_service = EmailService()
+@lru_cache()
+def get_email_service() -> EmailService:
+    """Return the shared EmailService, created on first use.
+
+    Creating it starts the scheduler and builds the Gmail client, so it is
+    deferred until a caller needs it rather than done at import.
+    """
+    return EmailService()
+
+def __getattr__(name: str) -> Any:
+    # Keep `from app.services.email_service import email_service` working
+    if name == "email_service":
+        return get_email_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,11 @@
-import json
+import asyncio
+import re
+import orjson
 import logging
 import time
-from functools import lru_cache
-from typing import List, Dict, Any, Optional
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
@@ -10,16 +13,65 @@ from googleapiclient.errors import HttpError
 
 from app.services.config_manager import get_settings, Settings
 from app.services.supabase_client import get_supabase_client
+from app.utils.client_guard import requires_client
 
 logger = logging.getLogger(__name__)
 settings: Settings = get_settings()
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+_requires_client = partial(requires_client, logger=logger)
+LEAD_CORE_COLUMNS = frozenset({"lead_id", "name", "phone", "email", "status"})
+# Tone examples are ";"-separated; the separator absorbs surrounding whitespace
+_EXAMPLE_SEPARATOR = re.compile(r"\s*;\s*")
+
+@lru_cache(maxsize=8)
+def _normalized_headers(headers: Tuple[str, ...]) -> Tuple[str, ...]:
+    # Header rows rarely change between fetches, so reuse the result
+    return tuple(h.strip().lower().replace(" ", "_") for h in headers)
+
+def _cell(row: List[Any], index: Optional[int], default: Any = None) -> Any:
+    """Value at a resolved column index; default if the column or cell is missing."""
+    if index is None or index >= len(row):
+        return default
+    return row[index]
+
+class AdaptiveConcurrency:
+    """Async concurrency limit that adapts to failures (AIMD).
+
+    The limit halves when an operation fails and grows by one per success,
+    up to ``maximum``. Operations already running are not interrupted.
+    """
+
+    def __init__(self, maximum: int):
+        self.maximum = max(1, maximum)
+        self.limit = self.maximum
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def record(self, ok: bool) -> None:
+        if ok:
+            self.limit = min(self.maximum, self.limit + 1)
+        else:
+            self.limit = max(1, self.limit // 2)
 
 class GoogleSheetsService:
     def __init__(self):
         self.client = None
         self.sheet_id = None
         self.ranges = None
+        # Range name -> (monotonic fetch time, rows), reused for GOOGLE_SHEETS_CACHE_TTL
+        self._row_cache: Dict[str, Tuple[float, List[List[Any]]]] = {}
+        # Hash of the last leads fully written to Supabase
+        self._synced_leads_hash: Optional[int] = None
 
         # Check for empty credentials
         raw_json = settings.GOOGLE_SHEETS_CREDENTIALS_JSON.strip()
@@ -28,7 +80,7 @@ class GoogleSheetsService:
             return
 
         try:
-            creds_info = json.loads(raw_json)
+            creds_info = settings.google_credentials_info
             creds = Credentials.from_service_account_info(creds_info, scopes=SCOPES)
             self.client = build("sheets", "v4", credentials=creds)
             self.sheet_id = settings.SHEET_ID
@@ -38,18 +90,39 @@ class GoogleSheetsService:
                 "tones": f"{settings.TONE_SETTINGS_SHEET_NAME}!{settings.GOOGLE_SHEETS_TONE_RANGE}",
             }
             logger.info("Google Sheets service initialized successfully")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid Google Sheets credentials JSON: {e}")
         except Exception as e:
             logger.error(f"Failed to initialize Google Sheets service: {e}")
 
-    def _normalize_headers(self, headers: List[str]) -> List[str]:
-        return [h.strip().lower().replace(" ", "_") for h in headers]
+    def _normalize_headers(self, headers: List[str]) -> Tuple[str, ...]:
+        return _normalized_headers(tuple(headers))
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop cached rows for one range, or all ranges, so the next read refetches.
 
+        Invalidating leads also forgets the last synced hash, so the next
+        upsert_leads writes the sheet rows back over any change made in
+        Supabase directly.
+        """
+        if name is None:
+            self._row_cache.clear()
+        else:
+            self._row_cache.pop(name, None)
+        if name in (None, "leads"):
+            self._synced_leads_hash = None
+
+    def _cached_rows(self, name: str) -> Optional[List[List[Any]]]:
+        entry = self._row_cache.get(name)
+        if entry is None or time.monotonic() - entry[0] > settings.GOOGLE_SHEETS_CACHE_TTL:
+            return None
+        return entry[1]
+
+    @_requires_client("Google Sheets client not initialized. Skipping fetch.", list)
     def _fetch_rows(self, name: str) -> List[List[Any]]:
-        if not self.client:
-            logger.warning("Google Sheets client not initialized. Skipping fetch.")
-            return []
+        rows = self._cached_rows(name)
+        if rows is not None:
+            return rows
 
         try:
             resp = (
@@ -58,94 +131,176 @@ class GoogleSheetsService:
                     .get(spreadsheetId=self.sheet_id, range=self.ranges[name])
                     .execute()
             )
-            return resp.get("values", [])
+            rows = resp.get("values", [])
+            self._row_cache[name] = (time.monotonic(), rows)
+            return rows
         except HttpError as e:
             logging.error("Google API error fetching %s: %s", name, e)
             return []
 
-    async def fetch_leads(self) -> List[Dict[str, Any]]:
-        if not self.client:
-            logger.warning("Google Sheets client not initialized. Skipping leads fetch.")
-            return []
+    @_requires_client("Google Sheets client not initialized. Skipping fetch.", dict)
+    def _fetch_all_rows(self) -> Dict[str, List[List[Any]]]:
+        """Read every configured range in one batchGet request."""
+        cached = {name: self._cached_rows(name) for name in self.ranges}
+        if all(rows is not None for rows in cached.values()):
+            return cached
 
-        rows = self._fetch_rows("leads")
-        if not rows or len(rows) < 2:
-            return []
-        headers = self._normalize_headers(rows[0])
-        leads: List[Dict[str, Any]] = []
-        for row in rows[1:]:
-            data = dict(zip(headers, row))
-            leads.append({
-                "id": data.get("lead_id", ""),
-                "name": data.get("name", ""),
-                "phone": data.get("phone", ""),
-                "email": data.get("email", ""),
-                "status": data.get("status", ""),
-                # collect any extra columns into metadata
-                "metadata": {k: v for k, v in data.items() if k not in {"lead_id","name","phone","email","status"}}
-            })
-        return leads
-
-    async def fetch_tones(self) -> Dict[str, Dict[str, Any]]:
-        if not self.client:
-            logger.warning("Google Sheets client not initialized. Skipping tones fetch.")
+        try:
+            resp = (
+                self.client.spreadsheets()
+                    .values()
+                    .batchGet(spreadsheetId=self.sheet_id, ranges=list(self.ranges.values()))
+                    .execute()
+            )
+            # valueRanges come back in request order
+            fetched_at = time.monotonic()
+            all_rows = {
+                name: value_range.get("values", [])
+                for name, value_range in zip(self.ranges, resp.get("valueRanges", []))
+            }
+            for name, rows in all_rows.items():
+                self._row_cache[name] = (fetched_at, rows)
+            return all_rows
+        except HttpError as e:
+            logging.error("Google API error fetching all ranges: %s", e)
             return {}
 
-        rows = self._fetch_rows("tones")
+    @_requires_client("Google Sheets client not initialized. Skipping refresh.", dict)
+    async def refresh_all(self) -> Dict[str, List[List[Any]]]:
+        """Fetch the leads and tones rows with a single Sheets request.
+
+        Returns rows by range name, for upsert_leads and upsert_tones; empty
+        if the request failed.
+        """
+        return await asyncio.to_thread(self._fetch_all_rows)
+
+    @_requires_client("Google Sheets client not initialized. Skipping leads fetch.", list)
+    async def fetch_leads(self, rows: Optional[List[List[Any]]] = None) -> List[Dict[str, Any]]:
+        """Parse lead rows, reading the leads range unless rows are given."""
+        return [lead async for lead in self.iter_leads(rows)]
+
+    async def iter_leads(self, rows: Optional[List[List[Any]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield parsed leads one at a time, reading the leads range unless rows are given.
+
+        The Sheets API returns the whole range at once, but consumers that
+        fold leads into their own structure avoid a second full list.
+        """
+        if rows is None:
+            rows = await asyncio.to_thread(self._fetch_rows, "leads")
+        if not rows or len(rows) < 2:
+            return
+        # Resolve column positions once per fetch; a repeated header maps to
+        # its last column. Extra columns go into metadata.
+        columns = {h: i for i, h in enumerate(self._normalize_headers(rows[0]))}
+        id_col = columns.get("lead_id")
+        name_col = columns.get("name")
+        phone_col = columns.get("phone")
+        email_col = columns.get("email")
+        status_col = columns.get("status")
+        metadata_cols = [(h, i) for h, i in columns.items() if h not in LEAD_CORE_COLUMNS]
+        for row in islice(rows, 1, None):
+            width = len(row)
+            yield {
+                "id": _cell(row, id_col, ""),
+                "name": _cell(row, name_col, ""),
+                "phone": _cell(row, phone_col, ""),
+                "email": _cell(row, email_col, ""),
+                "status": _cell(row, status_col, ""),
+                "metadata": {h: row[i] for h, i in metadata_cols if i < width}
+            }
+
+    @_requires_client("Google Sheets client not initialized. Skipping tones fetch.", dict)
+    async def fetch_tones(self, rows: Optional[List[List[Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Parse tone rows, reading the tones range unless rows are given."""
+        if rows is None:
+            rows = await asyncio.to_thread(self._fetch_rows, "tones")
         if not rows or len(rows) < 2:
             return {}
-        headers = self._normalize_headers(rows[0])
+        # Resolve column positions once; rows are then read by index
+        columns = {h: i for i, h in enumerate(self._normalize_headers(rows[0]))}
+        broker_col = columns.get("broker_id")
+        style_col = columns.get("tone_style")
+        examples_col = columns.get("examples")
         tones: Dict[str, Dict[str, Any]] = {}
         for row in rows[1:]:
-            data = dict(zip(headers, row))
-            broker_id = data.get("broker_id")
+            broker_id = _cell(row, broker_col)
             if not broker_id:
                 logging.warning("Skipping tone row without broker_id: %s", row)
                 continue
-            examples = (data.get("examples") or "")
+            examples = (_cell(row, examples_col) or "").strip()
             tones[broker_id] = {
-                "tone_style": data.get("tone_style", ""),
-                "examples": [ex.strip() for ex in examples.split(";") if ex.strip()],
+                "tone_style": _cell(row, style_col, ""),
+                "examples": [ex for ex in _EXAMPLE_SEPARATOR.split(examples) if ex],
             }
         return tones
 
-    async def upsert_leads(self) -> None:
-        if not self.client:
-            logger.warning("Google Sheets client not initialized. Skipping leads upsert.")
-            return
-
-        leads = await self.fetch_leads()
+    @_requires_client("Google Sheets client not initialized. Skipping leads upsert.")
+    async def upsert_leads(self, rows: Optional[List[List[Any]]] = None) -> None:
+        """Upsert sheet leads into Supabase, reading the leads range unless rows are given."""
         start = time.time()
         success, failed = 0, 0
-        for lead in leads:
-            try:
-                get_supabase_client().upsert_lead(lead)
-                success += 1
-            except Exception as e:
-                logging.error("Upsert lead %s failed: %s", lead.get("id"), e)
-                failed += 1
+        # Collapse repeated lead IDs as rows are parsed, keeping the last row
+        # for each; an upsert request cannot touch the same row twice
+        leads = list({lead["id"]: lead async for lead in self.iter_leads(rows)}.values())
+        # Skip the write when the sheet hasn't changed since the last full sync
+        leads_hash = hash(orjson.dumps(leads))
+        if leads_hash == self._synced_leads_hash:
+            logging.info("Leads unchanged since last sync; skipping upsert")
+            return
+        # One upsert request per chunk rather than per lead, with up to
+        # BATCH_MAX_WORKERS chunks in flight, backing off when chunks fail
+        chunk_size = settings.BATCH_CHUNK_SIZE
+        chunks = [leads[i:i + chunk_size] for i in range(0, len(leads), chunk_size)]
+        limit = AdaptiveConcurrency(settings.BATCH_MAX_WORKERS)
+        upsert = get_supabase_client().upsert_leads_bulk
+        results = await asyncio.gather(
+            *(self._upsert_chunk(upsert, "leads", chunk, limit) for chunk in chunks)
+        )
+        for chunk, written in zip(chunks, results):
+            success += written
+            failed += len(chunk) - written
+        self._synced_leads_hash = leads_hash if not failed else None
         logging.info("Leads upsert complete. Success: %d, Failed: %d, Time: %.2fs",
                      success, failed, time.time() - start)
 
-    async def upsert_tones(self) -> None:
-        if not self.client:
-            logger.warning("Google Sheets client not initialized. Skipping tones upsert.")
-            return
+    async def _upsert_chunk(
+        self,
+        upsert: Callable[[List[Dict[str, Any]]], Awaitable[int]],
+        kind: str,
+        chunk: List[Dict[str, Any]],
+        limit: "AdaptiveConcurrency"
+    ) -> int:
+        async with limit:
+            try:
+                written = await upsert(chunk)
+            except Exception as e:
+                logging.error("Upsert of %d %s starting at %s failed: %s",
+                              len(chunk), kind, chunk[0].get("id"), e)
+                written = 0
+            limit.record(written == len(chunk))
+            return written
 
-        tones = await self.fetch_tones()
+    @_requires_client("Google Sheets client not initialized. Skipping tones upsert.")
+    async def upsert_tones(self, rows: Optional[List[List[Any]]] = None) -> None:
+        """Upsert broker tones into Supabase, reading the tones range unless rows are given."""
+        tones = await self.fetch_tones(rows)
         start = time.time()
         success, failed = 0, 0
-        for broker_id, tone in tones.items():
-            try:
-                get_supabase_client().client.table("brokers").upsert({
-                    "id": broker_id,
-                    "tone_style": tone["tone_style"],
-                    "examples": tone["examples"],
-                }).execute()
-                success += 1
-            except Exception as e:
-                logging.error("Upsert tone %s failed: %s", broker_id, e)
-                failed += 1
+        rows = [
+            {"id": broker_id, "tone_style": tone["tone_style"], "examples": tone["examples"]}
+            for broker_id, tone in tones.items()
+        ]
+        # Chunked like leads; counts come from what each response reports
+        # as written, not what was sent
+        chunk_size = settings.BATCH_CHUNK_SIZE
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        limit = AdaptiveConcurrency(settings.BATCH_MAX_WORKERS)
+        upsert = get_supabase_client().upsert_brokers_bulk
+        results = await asyncio.gather(
+            *(self._upsert_chunk(upsert, "tones", chunk, limit) for chunk in chunks)
+        )
+        success = sum(results)
+        failed = len(rows) - success
         logging.info("Tones upsert complete. Success: %d, Failed: %d, Time: %.2fs",
                      success, failed, time.time() - start)
 
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional, Dict, Any
 import logging
 import httpx
@@ -11,12 +12,16 @@ class KixieHandler:
         self.base_url = settings.KIXIE_BASE_URL
         self.api_key = settings.KIXIE_API_KEY
         self.secret = settings.KIXIE_SECRET
+        # One pooled client for the process; connections are kept alive
+        # across sends so each message skips the TCP/TLS handshake
         self.client = httpx.AsyncClient(
             base_url=self.base_url,
             headers={
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
-            }
+            },
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+            timeout=httpx.Timeout(10.0)
         )
         self.supabase_client = get_supabase_client()
 
@@ -88,5 +93,7 @@ class KixieHandler:
         """Close the HTTP client."""
         await self.client.aclose()
 
-# Initialize Kixie handler
-kixie_handler = KixieHandler()
+@lru_cache()
+def get_kixie_handler() -> KixieHandler:
+    """Return the shared KixieHandler, created on first use inside the app."""
+    return KixieHandler()
@@ -1,9 +1,15 @@
-from prometheus_client import Counter, Gauge, Histogram, Summary
-from typing import Dict, Any
-from app.services.email_service import email_service
+from prometheus_client import Counter, Gauge, Histogram, Summary, REGISTRY, make_asgi_app, start_http_server
+from typing import Dict, Any, Tuple
+import logging
+import threading
+from app.services.config_manager import get_settings
+from app.services.email_service import get_email_service
 from app.services.retry_logger import retry_logger
 from app.jobs.followup_service import followup_service
 
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
 # Email Service Metrics
 EMAILS_SENT = Counter(
     'emails_sent_total',
@@ -71,9 +77,41 @@ SERVICE_HEALTH = Gauge(
     ['service']
 )
 
+# Services keep plain running totals; each scrape folds only what changed
+# since the previous scrape into the Prometheus counters
+_EMAILS_SENT_DEFAULT = EMAILS_SENT.labels(template='default')
+_EMAILS_FAILED_DEFAULT = EMAILS_FAILED.labels(error_type='default')
+_FOLLOWUPS_SENT_DEFAULT = FOLLOWUPS_SENT.labels(template='default')
+_FOLLOWUPS_FAILED_DEFAULT = FOLLOWUPS_FAILED.labels(error_type='default')
+_EMAIL_HEALTH = SERVICE_HEALTH.labels(service='email')
+_FOLLOWUP_HEALTH = SERVICE_HEALTH.labels(service='followup')
+_last_totals: Dict[Tuple[str, str], int] = {}
+# Scrapes can arrive concurrently from the metrics port and /metrics
+_totals_lock = threading.Lock()
+
+def _advance(counter, key: Tuple[str, str], total: int) -> None:
+    """Increment counter by the growth of a service's running total."""
+    with _totals_lock:
+        delta = total - _last_totals.get(key, 0)
+        _last_totals[key] = total
+    if delta > 0:
+        counter.inc(delta)
+
+# Per-job retry counter children, resolved once per job name
+_job_children: Dict[Tuple[str, str], Any] = {}
+
+def _job_child(counter, job_name: str):
+    """Return counter's child for job_name, caching the labels() lookup."""
+    key = (counter._name, job_name)
+    child = _job_children.get(key)
+    if child is None:
+        child = _job_children[key] = counter.labels(job_name=job_name)
+    return child
+
 def collect_metrics() -> Dict[str, Any]:
     """Collect all metrics from services and update Prometheus metrics."""
     # Email Service Metrics
+    email_service = get_email_service()
     email_stats = email_service.get_stats()
     email_metrics = email_service.metrics
 
@@ -81,33 +119,70 @@ def collect_metrics() -> Dict[str, Any]:
     EMAIL_RETRY_QUEUE_SIZE.set(len(email_service.retry_queue))
 
     # Update counters based on metrics
-    EMAILS_SENT.labels(template='default').inc(email_metrics.total_sent)
-    EMAILS_FAILED.labels(error_type='default').inc(email_metrics.total_failed)
+    _advance(_EMAILS_SENT_DEFAULT, ('emails_sent', 'default'), email_metrics.total_sent)
+    _advance(_EMAILS_FAILED_DEFAULT, ('emails_failed', 'default'), email_metrics.total_failed)
 
     # Service health
-    SERVICE_HEALTH.labels(service='email').set(1 if email_service.is_healthy() else 0)
+    _EMAIL_HEALTH.set(1 if email_service.is_healthy() else 0)
 
     # Follow-up Service Metrics
     followup_stats = followup_service.get_stats()
 
     FOLLOWUP_QUEUE_SIZE.set(followup_stats['queue_size'])
-    FOLLOWUPS_SENT.labels(template='default').inc(followup_stats['metrics']['successful_followups'])
-    FOLLOWUPS_FAILED.labels(error_type='default').inc(followup_stats['metrics']['failed_followups'])
+    _advance(_FOLLOWUPS_SENT_DEFAULT, ('followups_sent', 'default'), followup_stats['metrics']['successful_followups'])
+    _advance(_FOLLOWUPS_FAILED_DEFAULT, ('followups_failed', 'default'), followup_stats['metrics']['failed_followups'])
 
     # Service health
-    SERVICE_HEALTH.labels(service='followup').set(1 if followup_service.is_healthy() else 0)
+    _FOLLOWUP_HEALTH.set(1 if followup_service.is_healthy() else 0)
 
     # Retry Logger Metrics
     retry_stats = retry_logger.get_stats()
 
     for job_name, count in retry_stats['retry_counts'].items():
-        RETRY_ATTEMPTS.labels(job_name=job_name).inc(count)
+        if count != _last_totals.get(('retry_attempts', job_name)):
+            _advance(_job_child(RETRY_ATTEMPTS, job_name), ('retry_attempts', job_name), count)
 
     for job_name, count in retry_stats['failure_counts'].items():
-        RETRY_FAILURES.labels(job_name=job_name).inc(count)
+        if count != _last_totals.get(('retry_failures', job_name)):
+            _advance(_job_child(RETRY_FAILURES, job_name), ('retry_failures', job_name), count)
 
     return {
         'email_service': email_stats,
         'followup_service': followup_stats,
         'retry_logger': retry_stats
     }
+
+
+class _RefreshingRegistry:
+    """Registry view that refreshes service metrics before each scrape."""
+
+    def collect(self):
+        collect_metrics()
+        return REGISTRY.collect()
+
+    def restricted_registry(self, names):
+        collect_metrics()
+        return REGISTRY.restricted_registry(names)
+
+def make_metrics_app():
+    """ASGI app serving metrics, refreshing service stats on each scrape."""
+    return make_asgi_app(registry=_RefreshingRegistry())
+
+def start_metrics_server() -> bool:
+    """Expose metrics on PROMETHEUS_PORT from a background thread.
+
+    Scrapes are served outside the FastAPI event loop so they don't compete
+    with API requests. Returns False when no port is configured.
+    """
+    if not settings.PROMETHEUS_PORT:
+        logger.warning("PROMETHEUS_PORT not configured, metrics server disabled")
+        return False
+
+    try:
+        start_http_server(settings.PROMETHEUS_PORT, registry=_RefreshingRegistry())
+    except OSError as e:
+        # With multiple workers only the first one can bind the port
+        logger.warning(f"Metrics server not started on port {settings.PROMETHEUS_PORT}: {e}")
+        return False
+    logger.info(f"Prometheus metrics server listening on port {settings.PROMETHEUS_PORT}")
+    return True
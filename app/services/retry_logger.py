@@ -1,6 +1,9 @@
+import asyncio
 import logging
-import json
-from datetime import datetime
+import random
+import orjson
+from collections import Counter
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from functools import wraps
 
@@ -10,16 +13,16 @@ class RetryLogger:
     """Service for logging retries and failures of async jobs."""
 
     def __init__(self):
-        self.retry_counts: Dict[str, int] = {}
-        self.failure_counts: Dict[str, int] = {}
+        self.retry_counts: Counter[str] = Counter()
+        self.failure_counts: Counter[str] = Counter()
         self.last_failures: Dict[str, Dict[str, Any]] = {}
 
     def log_retry(self, job_name: str, error: Exception, attempt: int, max_retries: int) -> None:
         """Log a retry attempt for a job."""
-        self.retry_counts[job_name] = self.retry_counts.get(job_name, 0) + 1
+        self.retry_counts[job_name] += 1
 
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),  # orjson writes ISO 8601, Z suffix
             "job": job_name,
             "attempt": attempt,
             "max_retries": max_retries,
@@ -28,14 +31,15 @@ class RetryLogger:
             "total_retries": self.retry_counts[job_name]
         }
 
-        logger.warning(f"Job retry: {json.dumps(log_data)}")
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("Job retry: %s", orjson.dumps(log_data, option=orjson.OPT_UTC_Z).decode())
 
     def log_failure(self, job_name: str, error: Exception, final_attempt: int) -> None:
         """Log a final failure after all retries."""
-        self.failure_counts[job_name] = self.failure_counts.get(job_name, 0) + 1
+        self.failure_counts[job_name] += 1
 
         failure_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc),  # orjson writes ISO 8601, Z suffix
             "job": job_name,
             "final_attempt": final_attempt,
             "error": str(error),
@@ -44,7 +48,8 @@ class RetryLogger:
         }
 
         self.last_failures[job_name] = failure_data
-        logger.error(f"Job failed: {json.dumps(failure_data)}")
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error("Job failed: %s", orjson.dumps(failure_data, option=orjson.OPT_UTC_Z).decode())
 
     def get_stats(self) -> Dict[str, Any]:
         """Get current retry and failure statistics."""
@@ -57,32 +62,32 @@ class RetryLogger:
 # Global instance
 retry_logger = RetryLogger()
 
-def with_retry_logging(max_retries: int = 3, job_name: Optional[str] = None):
-    """Decorator to add retry logging to async functions."""
+def with_retry_logging(
+    max_retries: int = 3,
+    job_name: Optional[str] = None,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0
+):
+    """Decorator to add retry logging to async functions.
+
+    Retry n waits a random time in [0, min(max_delay, base_delay * 2**n)]
+    (full jitter), so failing jobs back off instead of retrying at once.
+    """
     def decorator(func):
+        # Resolve the job name once per decorated function, not per call
+        name = job_name or func.__name__
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            nonlocal job_name
-            if job_name is None:
-                job_name = func.__name__
-
-            attempt = 0
-            last_error = None
-
-            while attempt < max_retries:
+            for attempt in range(1, max_retries + 1):
                 try:
-                    attempt += 1
                     return await func(*args, **kwargs)
                 except Exception as e:
-                    last_error = e
-                    if attempt < max_retries:
-                        retry_logger.log_retry(job_name, e, attempt, max_retries)
-                    else:
-                        retry_logger.log_failure(job_name, e, attempt)
+                    if attempt == max_retries:
+                        retry_logger.log_failure(name, e, attempt)
                         raise
-
-            # This should never be reached due to the raise in the else clause
-            raise last_error
+                    retry_logger.log_retry(name, e, attempt, max_retries)
+                    await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1))))
 
         return wrapper
     return decorator
@@ -1,52 +1,68 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import logging
+import httpx
+import orjson
+from postgrest.utils import SyncClient
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from app.services.config_manager import get_settings
+from app.services.retry_logger import with_retry_logging
+from app.utils.client_guard import requires_client
 from pydantic import BaseModel
-from functools import wraps
 import time
 import os
 import asyncio
+from functools import partial
 
 logger = logging.getLogger(__name__)
 
 # Initialize settings
 settings = get_settings()
 
+# Methods decorated with this return a default instead of querying when
+# the client is missing, e.g. @_requires_client(list)
+_requires_client = partial(requires_client, "Supabase client not initialized", logger=logger)
+
+# Bulk conversation inserts above this many rows use COPY over a direct
+# database connection when SUPABASE_DB_URL is set
+CONVERSATION_COPY_THRESHOLD = 50
+_CONVERSATION_COPY_SQL = (
+    "COPY conversations (lead_id, message, direction, status, metadata, created_at) FROM STDIN"
+)
+
+# Bulk conversation fetches query this many leads at a time, reading pages
+# no larger than PostgREST's default max-rows
+CONVERSATION_BULK_CHUNK = 100
+CONVERSATION_PAGE_SIZE = 1000
+
+def _copy_conversations(db_url: str, records: List[Dict[str, Any]]) -> int:
+    """COPY conversation records into the conversations table; blocking."""
+    import psycopg
+
+    with psycopg.connect(db_url) as conn:
+        with conn.cursor().copy(_CONVERSATION_COPY_SQL) as copy:
+            for record in records:
+                copy.write_row((
+                    record["lead_id"],
+                    record["message"],
+                    record["direction"],
+                    record["status"],
+                    orjson.dumps(record.get("metadata") or {}).decode(),
+                    record["created_at"],
+                ))
+    return len(records)
+
 def retry_on_failure(times: int = 3, delay: float = 1.0):
-    """Decorator for retrying failed Supabase operations with exponential backoff."""
+    """Retry failed Supabase operations with jittered exponential backoff.
+
+    Shares with_retry_logging's loop, so Supabase retries and failures show
+    up in retry_logger stats as "supabase.<method>".
+    """
     def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            last_error = None
-            for attempt in range(times):
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    last_error = e
-                    logger.warning(
-                        f"Supabase call failed (attempt {attempt+1}/{times}): {str(e)}",
-                        extra={
-                            "function": func.__name__,
-                            "attempt": attempt + 1,
-                            "max_attempts": times
-                        }
-                    )
-                    if attempt < times - 1:  # Don't sleep on the last attempt
-                        sleep_time = delay * (2 ** attempt)
-                        logger.info(f"Retrying in {sleep_time:.2f} seconds...")
-                        await asyncio.sleep(sleep_time)
-
-            logger.error(
-                f"Supabase call failed after {times} attempts",
-                extra={
-                    "function": func.__name__,
-                    "error": str(last_error)
-                }
-            )
-            raise RuntimeError(f"Supabase call failed after {times} attempts: {str(last_error)}")
-        return wrapper
+        return with_retry_logging(
+            max_retries=times, job_name=f"supabase.{func.__name__}", base_delay=delay
+        )(func)
     return decorator
 
 class SupabaseClient:
@@ -70,7 +86,22 @@ class SupabaseClient:
                 os.environ.pop(proxy_key, None)
 
             # Initialize Supabase client
-            self._client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+            client = create_client(
+                settings.SUPABASE_URL,
+                settings.SUPABASE_SERVICE_KEY,
+                options=ClientOptions(postgrest_client_timeout=10)
+            )
+            # Queries run concurrently in worker threads; give the shared
+            # PostgREST session a keep-alive pool sized for that
+            session = client.postgrest.session
+            client.postgrest.session = SyncClient(
+                base_url=session.base_url,
+                headers=session.headers,
+                timeout=session.timeout,
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+            )
+            session.close()
+            self._client = client
             logger.info("Supabase client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {str(e)}")
@@ -83,6 +114,7 @@ class SupabaseClient:
             self.initialize()
         return self._client
 
+    @_requires_client()
     @retry_on_failure(times=3, delay=0.5)
     async def insert_conversation(
         self,
@@ -93,10 +125,6 @@ class SupabaseClient:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """Insert a new conversation record."""
-        if not self.client:
-            logger.warning("Supabase client not initialized")
-            return None
-
         try:
             data = {
                 "lead_id": lead_id,
@@ -106,12 +134,13 @@ class SupabaseClient:
                 "metadata": metadata or {},
                 "created_at": datetime.utcnow().isoformat()
             }
-            result = self.client.table("conversations").insert(data).execute()
+            result = await asyncio.to_thread(self.client.table("conversations").insert(data).execute)
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to insert conversation: {e}")
             return None
 
+    @_requires_client(list)
     @retry_on_failure(times=3, delay=0.5)
     async def fetch_recent_conversations(
         self,
@@ -120,22 +149,75 @@ class SupabaseClient:
         before_date: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """Fetch recent conversations for a lead."""
-        if not self.client:
-            logger.warning("Supabase client not initialized")
-            return []
-
         try:
             query = self.client.table("conversations").select("*").eq("lead_id", lead_id)
 
             if before_date:
                 query = query.lt("created_at", before_date.isoformat())
 
-            result = query.order("created_at", desc=True).limit(limit).execute()
+            result = await asyncio.to_thread(query.order("created_at", desc=True).limit(limit).execute)
             return result.data or []
         except Exception as e:
             logger.error(f"Failed to fetch conversations: {e}")
             return []
 
+    async def fetch_recent_conversations_bulk(
+        self,
+        lead_ids: List[str],
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch recent conversations for many leads, CONVERSATION_BULK_CHUNK leads per query.
+
+        Returns a mapping of lead_id to its newest conversations (at most
+        ``limit`` each, newest first). Leads whose conversations could not
+        be fetched have no entry, so callers can tell them apart from leads
+        with no conversations.
+        """
+        if not self.client:
+            logger.warning("Supabase client not initialized")
+            return {}
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        unique_ids = list(dict.fromkeys(lead_ids))
+        for start in range(0, len(unique_ids), CONVERSATION_BULK_CHUNK):
+            chunk = unique_ids[start:start + CONVERSATION_BULK_CHUNK]
+            try:
+                grouped.update(await self._fetch_conversation_chunk(chunk, limit))
+            except Exception as e:
+                logger.error(f"Failed to fetch conversations for {len(chunk)} leads: {e}")
+        return grouped
+
+    @retry_on_failure(times=3, delay=0.5)
+    async def _fetch_conversation_chunk(
+        self,
+        lead_ids: List[str],
+        limit: int
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Page through the newest conversations of lead_ids; raises on failure."""
+        grouped: Dict[str, List[Dict[str, Any]]] = {lead_id: [] for lead_id in lead_ids}
+        open_leads = len(grouped)
+        offset = 0
+        while open_leads:
+            query = (
+                self.client.table("conversations")
+                .select("*")
+                .in_("lead_id", lead_ids)
+                .order("created_at", desc=True)
+                .range(offset, offset + CONVERSATION_PAGE_SIZE)  # end is exclusive here
+            )
+            rows = (await asyncio.to_thread(query.execute)).data or []
+            for row in rows:
+                bucket = grouped.get(row.get("lead_id"))
+                if bucket is not None and len(bucket) < limit:
+                    bucket.append(row)
+                    if len(bucket) == limit:
+                        open_leads -= 1
+            if len(rows) < CONVERSATION_PAGE_SIZE:
+                break
+            offset += CONVERSATION_PAGE_SIZE
+        return grouped
+
+    @_requires_client()
     @retry_on_failure(times=3, delay=0.5)
     async def update_lead_status(
         self,
@@ -144,45 +226,118 @@ class SupabaseClient:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """Update lead status and metadata."""
-        if not self.client:
-            logger.warning("Supabase client not initialized")
-            return None
-
         try:
             data = {
                 "status": status,
                 "metadata": metadata or {},
                 "updated_at": datetime.utcnow().isoformat()
             }
-            result = self.client.table("leads").update(data).eq("id", lead_id).execute()
+            result = await asyncio.to_thread(self.client.table("leads").update(data).eq("id", lead_id).execute)
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to update lead status: {e}")
             return None
 
+    @_requires_client(int)
+    @retry_on_failure(times=3, delay=0.5)
+    async def upsert_leads_bulk(self, leads: List[Dict[str, Any]]) -> int:
+        """Upsert many leads in a single request; returns the number of rows written."""
+        if not leads:
+            return 0
+
+        try:
+            # Run the blocking request off the event loop so chunks can overlap
+            result = await asyncio.to_thread(
+                self.client.table("leads").upsert(leads, on_conflict="id").execute
+            )
+            return len(result.data or [])
+        except Exception as e:
+            logger.error(f"Failed to upsert leads in bulk: {e}")
+            return 0
+
+    @_requires_client(int)
+    @retry_on_failure(times=3, delay=0.5)
+    async def upsert_brokers_bulk(self, brokers: List[Dict[str, Any]]) -> int:
+        """Upsert many broker rows in a single request; returns the number of rows written."""
+        if not brokers:
+            return 0
+
+        try:
+            result = await asyncio.to_thread(
+                self.client.table("brokers").upsert(brokers, on_conflict="id").execute
+            )
+            return len(result.data or [])
+        except Exception as e:
+            logger.error(f"Failed to upsert brokers in bulk: {e}")
+            return 0
+
+    @_requires_client(int)
+    @retry_on_failure(times=3, delay=0.5)
+    async def insert_conversations_bulk(self, records: List[Dict[str, Any]]) -> int:
+        """Insert many conversation records in a single request; returns the number inserted.
+
+        Batches over CONVERSATION_COPY_THRESHOLD rows are streamed with COPY
+        when a direct database URL is configured, falling back to PostgREST
+        if that fails.
+        """
+        if not records:
+            return 0
+
+        if len(records) > CONVERSATION_COPY_THRESHOLD and settings.SUPABASE_DB_URL:
+            try:
+                return await asyncio.to_thread(_copy_conversations, settings.SUPABASE_DB_URL, records)
+            except Exception as e:
+                logger.warning(f"COPY of {len(records)} conversations failed, using PostgREST: {e}")
+
+        try:
+            result = await asyncio.to_thread(self.client.table("conversations").insert(records).execute)
+            return len(result.data or [])
+        except Exception as e:
+            logger.error(f"Failed to insert conversations in bulk: {e}")
+            return 0
+
+    @_requires_client()
     @retry_on_failure(times=3, delay=0.5)
     async def get_lead_details(self, lead_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a lead."""
-        if not self.client:
-            logger.warning("Supabase client not initialized")
-            return None
-
         try:
-            result = self.client.table("leads").select("*").eq("id", lead_id).execute()
+            result = await asyncio.to_thread(self.client.table("leads").select("*").eq("id", lead_id).execute)
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to get lead details: {e}")
             return None
 
+    @_requires_client(lambda: (None, []))
+    @retry_on_failure(times=3, delay=0.5)
+    async def get_lead_with_recent_conversations(
+        self,
+        lead_id: str,
+        limit: int = 10
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Get a lead and its newest conversations (newest first) in one query."""
+        try:
+            query = (
+                self.client.table("leads")
+                .select("*, conversations(*)")
+                .eq("id", lead_id)
+                .order("created_at", desc=True, foreign_table="conversations")
+                .limit(limit, foreign_table="conversations")
+            )
+            result = await asyncio.to_thread(query.execute)
+            if not result.data:
+                return None, []
+            lead = result.data[0]
+            return lead, lead.pop("conversations", None) or []
+        except Exception as e:
+            logger.error(f"Failed to get lead with conversations: {e}")
+            return None, []
+
+    @_requires_client(list)
     @retry_on_failure(times=3, delay=0.5)
     async def fetch_leads(self) -> List[Dict[str, Any]]:
         """Fetch all active leads."""
-        if not self.client:
-            logger.warning("Supabase client not initialized")
-            return []
-
         try:
-            result = self.client.table("leads").select("*").eq("status", "active").execute()
+            result = await asyncio.to_thread(self.client.table("leads").select("*").eq("status", "active").execute)
             return result.data or []
         except Exception as e:
             logger.error(f"Failed to fetch leads: {e}")
@@ -192,39 +347,33 @@ class SupabaseClient:
         """Check if the Supabase connection is healthy."""
         try:
             # Try to execute a simple query
-            self.client.table("leads").select("count", count="exact").limit(1).execute()
+            await asyncio.to_thread(self.client.table("leads").select("count", count="exact").limit(1).execute)
             return True
         except Exception as e:
             logger.error(f"Supabase health check failed: {str(e)}")
             return False
 
+    @_requires_client(list)
     @retry_on_failure(times=3, delay=0.5)
     async def get_queued_followups(self) -> List[Dict[str, Any]]:
         """Fetch all queued follow-ups."""
-        if not self.client:
-            logger.warning("Supabase client not initialized")
-            return []
-
         try:
-            result = self.client.table("followups").select("*").eq("status", "queued").execute()
+            result = await asyncio.to_thread(self.client.table("followups").select("*").eq("status", "queued").execute)
             return result.data or []
         except Exception as e:
             logger.error(f"Failed to fetch queued follow-ups: {e}")
             return []
 
+    @_requires_client()
     @retry_on_failure(times=3, delay=0.5)
     async def mark_followup_sent(self, followup_id: str) -> Optional[Dict[str, Any]]:
         """Mark a follow-up as sent."""
-        if not self.client:
-            logger.warning("Supabase client not initialized")
-            return None
-
         try:
             data = {
                 "status": "sent",
                 "sent_at": datetime.utcnow().isoformat()
             }
-            result = self.client.table("followups").update(data).eq("id", followup_id).execute()
+            result = await asyncio.to_thread(self.client.table("followups").update(data).eq("id", followup_id).execute)
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to mark follow-up as sent: {e}")
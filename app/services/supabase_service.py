@@ -1,21 +1,60 @@
+import atexit
 import logging
+import threading
 import time
 import random
 from datetime import datetime
+from typing import List
 from prometheus_client import Counter
-from app.services.config_manager import settings
+from app.services.supabase_client import get_supabase_client
 from app.core.decorators import with_retry
 
 logger = logging.getLogger("lead_followup.supabase_service")
 supabase_errors = Counter("supabase_errors_total", "Supabase operation failures")
-supabase = settings.supabase_client
+
+
+def _followup_logs():
+    """Query builder for followup_logs on the shared Supabase client."""
+    return get_supabase_client().client.table("followup_logs")
+
+
+# Buffered follow-up log rows are written once this many are pending or
+# the oldest has waited FOLLOWUP_LOG_FLUSH_INTERVAL seconds
+FOLLOWUP_LOG_BATCH_SIZE = 100
+FOLLOWUP_LOG_FLUSH_INTERVAL = 1.0
 
 
 class SupabaseService:
+    def __init__(self):
+        self._pending: List[dict] = []
+        self._pending_since = 0.0
+        self._flush_lock = threading.Lock()
+
     @with_retry(error_counter=supabase_errors)
+    def _insert_logs(self, rows: List[dict]):
+        _followup_logs().insert(rows).execute()
+
+    def flush(self):
+        """Write buffered follow-up log rows in a single insert."""
+        with self._flush_lock:
+            rows, self._pending = self._pending, []
+            if not rows:
+                return
+            try:
+                self._insert_logs(rows)
+            except Exception:
+                # Keep the rows for the next flush
+                self._pending[:0] = rows
+                raise
+
     def has_followup(self, row_number: int, date_str: str) -> bool:
+        self.flush()
+        return self._has_followup(row_number, date_str)
+
+    @with_retry(error_counter=supabase_errors)
+    def _has_followup(self, row_number: int, date_str: str) -> bool:
         resp = (
-            supabase.table("followup_logs")
+            _followup_logs()
             .select("id")
             .eq("sheet_row", row_number)
             .eq("date", date_str)
@@ -23,24 +62,37 @@ class SupabaseService:
         )
         return bool(resp.data)
 
-    @with_retry(error_counter=supabase_errors)
     def log_followup(
         self, row_number: int, action: str, date_str: str, first_name: str, company: str
     ):
-        supabase.table("followup_logs").insert(
-            {
-                "sheet_row": row_number,
-                "action": action,
-                "date": date_str,
-                "timestamp": datetime.utcnow().isoformat(),
-                "metadata": {"first_name": first_name, "company": company},
-            }
-        ).execute()
+        """Buffer a follow-up log row; rows are inserted in batches by flush()."""
+        with self._flush_lock:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(
+                {
+                    "sheet_row": row_number,
+                    "action": action,
+                    "date": date_str,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "metadata": {"first_name": first_name, "company": company},
+                }
+            )
+            due = (
+                len(self._pending) >= FOLLOWUP_LOG_BATCH_SIZE
+                or time.monotonic() - self._pending_since >= FOLLOWUP_LOG_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
 
-    @with_retry(error_counter=supabase_errors)
     def get_today_followups(self, date_str: str) -> list:
+        self.flush()
+        return self._get_today_followups(date_str)
+
+    @with_retry(error_counter=supabase_errors)
+    def _get_today_followups(self, date_str: str) -> list:
         resp = (
-            supabase.table("followup_logs")
+            _followup_logs()
             .select("metadata")
             .eq("date", date_str)
             .execute()
@@ -52,3 +104,11 @@ class SupabaseService:
 
 
 supabase_service = SupabaseService()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        supabase_service.flush()
+    except Exception as e:
+        logger.error(f"Failed to write {len(supabase_service._pending)} follow-up logs at exit: {e}")
@@ -0,0 +1,40 @@
+import functools
+import inspect
+import logging
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def requires_client(
+    message: str,
+    default: Optional[Callable[[], Any]] = None,
+    logger: logging.Logger = logging.getLogger(__name__),
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Skip a service method, logging message, when ``self.client`` is unset.
+
+    The skipped call returns ``default()`` (None when no factory is given),
+    so mutable defaults like lists are fresh per call. Works on both sync
+    and async methods.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                if not self.client:
+                    logger.warning(message)
+                    return default() if default else None
+                return await func(self, *args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not self.client:
+                logger.warning(message)
+                return default() if default else None
+            return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
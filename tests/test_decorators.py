@@ -0,0 +1,20 @@
+import pytest
+from unittest.mock import Mock, patch
+from app.core.decorators import with_retry
+
+
+def test_with_retry_full_jitter_backoff():
+    """Test retries sleep within the capped exponential bound, then re-raise."""
+    counter = Mock()
+    func = Mock(side_effect=ValueError("boom"))
+    wrapped = with_retry(max_retries=4, backoff_base=2, error_counter=counter,
+                         base_delay=1.0, max_delay=3.0)(func)
+
+    with patch("app.core.decorators.time.sleep") as sleep, \
+            patch("app.core.decorators.random.uniform", side_effect=lambda lo, hi: hi):
+        with pytest.raises(ValueError):
+            wrapped()
+
+    assert func.call_count == 4
+    assert counter.inc.call_count == 4
+    assert [c.args[0] for c in sleep.call_args_list] == [1.0, 2.0, 3.0]
@@ -1,7 +1,10 @@
+import base64
 import pytest
+from email import message_from_bytes
+from email.policy import default
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime, time
-from app.services.email_service import EmailService, email_service
+from app.services.email_service import EmailService, TokenBucket, email_service
 from app.services.config_manager import get_settings
 
 @pytest.fixture
@@ -170,3 +173,67 @@ async def test_business_hours_check(mock_gmail_service, mock_settings):
         # Test outside business hours
         mock_datetime.now.return_value = datetime(2024, 1, 1, 8, 0)  # 8 AM
         assert service.is_within_business_hours() is False
+
+@pytest.mark.asyncio
+async def test_raw_message_encodes_non_ascii_headers(mock_gmail_service, mock_settings):
+    """Test non-ASCII subjects and display names are RFC 2047 encoded."""
+    service = EmailService()
+
+    msg = service._build_message("José <jose@example.com>", "Grüße", "Hallo", "plain")
+    raw = base64.urlsafe_b64decode(service._raw_message(msg))
+
+    assert b"Subject: =?utf-8?q?Gr=C3=BC=C3=9Fe?=\r\n" in raw
+    assert b"To: =?utf-8?q?Jos=C3=A9?= <jose@example.com>\r\n" in raw
+    parsed = message_from_bytes(raw, policy=default)
+    assert parsed["Subject"] == "Grüße"
+    assert parsed["To"] == "José <jose@example.com>"
+
+@pytest.mark.asyncio
+async def test_bulk_raw_message_non_ascii(mock_gmail_service, mock_settings):
+    """Test bulk messages reuse skeletons without breaking header encoding."""
+    service = EmailService()
+    skeletons = {}
+
+    for to in ["a@example.com", "b@example.com", "José <jose@example.com>"]:
+        raw = base64.urlsafe_b64decode(
+            service._bulk_raw_message(to, "Grüße", None, None, "Hallo", skeletons)
+        )
+        parsed = message_from_bytes(raw, policy=default)
+        assert parsed["To"] == to
+        assert parsed["Subject"] == "Grüße"
+        assert b"placeholder" not in raw
+
+    assert len(skeletons) == 1
+
+@pytest.mark.asyncio
+async def test_token_bucket_charges_per_message(mock_gmail_service, mock_settings):
+    """Test Gmail batch sends take one rate limit token per message."""
+    service = EmailService()
+    service.gmail_service = mock_gmail_service
+    service._rate_limiter = TokenBucket(5, 60.0)
+
+    results = await service._send_batch_via_gmail(["raw1", "raw2", "raw3"])
+
+    assert len(results) == 3
+    assert service._rate_limiter.tokens == pytest.approx(2, abs=0.01)
+    with pytest.raises(ValueError):
+        await service._rate_limiter.acquire(6)
+
+def test_render_template_matches_direct_render():
+    """Test cached renders match direct renders, including non-JSON values."""
+    import enum
+    from jinja2 import Template
+    from app.services import email_service as module
+
+    class Size(enum.Enum):
+        A = "a"
+
+    source = "{{ x }}|{{ y }}"
+    with patch.dict(module._templates, {"inline": Template(source)}):
+        for data in [
+            {"x": (1, 2), "y": Size.A},
+            {"x": [1, 2], "y": {"b": 1, "a": None}},
+            {"x": "plain", "y": 1.5},
+            {"x": float("nan"), "y": 2 ** 70},
+        ]:
+            assert module.render_template("inline", data) == Template(source).render(**data)
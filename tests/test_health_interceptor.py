@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.api.health_interceptor import HealthCheckInterceptor, cached_probe
+
+
+def test_cached_probe_reuses_result():
+    """Test a cached probe runs once per TTL window."""
+    calls = 0
+
+    @cached_probe(60)
+    def probe():
+        nonlocal calls
+        calls += 1
+        return 200, "text/plain", b"ok"
+
+    assert probe() == (200, "text/plain", b"ok")
+    assert probe() == (200, "text/plain", b"ok")
+    assert calls == 1
+
+
+async def _call(app, path, method="GET"):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "path": path, "method": method}, AsyncMock(), send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_interceptor_routes_probes():
+    """Test probe paths are answered directly and other paths pass through."""
+    inner = AsyncMock()
+    app = HealthCheckInterceptor(inner, {"/health": lambda: (200, "application/json", b"{}")})
+
+    sent = await _call(app, "/health")
+    assert sent[0]["status"] == 200
+    assert sent[1]["body"] == b"{}"
+
+    sent = await _call(app, "/health", method="HEAD")
+    assert sent[1]["body"] == b""
+
+    sent = await _call(app, "/health", method="POST")
+    assert sent[0]["status"] == 405
+
+    await _call(app, "/leads")
+    inner.assert_awaited_once()
@@ -0,0 +1,47 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.priority import PriorityScorer
+
+
+def _ago(hours):
+    return (datetime.now() - timedelta(hours=hours)).isoformat()
+
+
+@pytest.fixture
+def leads():
+    """Leads covering each scoring branch, including missing and bad values."""
+    return [
+        {"id": "1", "last_response_time": _ago(0.5), "last_contact": _ago(10),
+         "metadata": {"source": "Referral", "priority": "High"}},
+        {"id": "2", "last_response_time": _ago(10), "last_contact": _ago(48),
+         "metadata": {"source": "website", "budget": 90, "property_value": 60, "urgency": 30}},
+        {"id": "3", "last_response_time": _ago(48), "last_contact": _ago(100),
+         "metadata": {"source": "unknown", "priority": "Low"}},
+        {"id": "4", "last_response_time": _ago(100), "last_contact": _ago(200),
+         "metadata": {"source": "phone", "budget": "n/a"}},
+        {"id": "5", "last_response_time": _ago(500), "last_contact": _ago(500),
+         "metadata": {"priority": "Medium"}},
+        {"id": "6", "last_response_time": "not a date", "last_contact": "not a date",
+         "metadata": {}},
+        {"id": "7", "metadata": {"source": "social"}},
+    ]
+
+
+def test_calculate_priority_scores_matches_per_lead(leads):
+    """Test the vectorized scores match calculate_priority_score lead by lead."""
+    scorer = PriorityScorer()
+    conversations = {
+        "1": [{}] * 12,
+        "2": [{}] * 6,
+        "3": [{}] * 3,
+        "4": [{}],
+        "5": [],
+    }
+
+    scores = scorer.calculate_priority_scores(leads, conversations)
+
+    expected = [
+        scorer.calculate_priority_score(lead, conversations.get(lead["id"], []))
+        for lead in leads
+    ]
+    assert scores.tolist() == pytest.approx(expected)
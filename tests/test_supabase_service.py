@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import patch
+from app.services import supabase_service as module
+from app.services.supabase_service import SupabaseService
+
+
+@pytest.fixture
+def followup_logs():
+    """Patch the followup_logs query builder."""
+    with patch.object(module, "_followup_logs") as table, \
+            patch("app.core.decorators.time.sleep"):
+        yield table
+
+
+def test_log_followup_buffers_until_batch_size(followup_logs):
+    """Test follow-up logs are inserted in one request per batch."""
+    service = SupabaseService()
+    with patch.object(module, "FOLLOWUP_LOG_BATCH_SIZE", 3), \
+            patch.object(module, "FOLLOWUP_LOG_FLUSH_INTERVAL", 60):
+        service.log_followup(1, "email", "2024-01-01", "Ann", "Acme")
+        service.log_followup(2, "email", "2024-01-01", "Bob", "Beta")
+        followup_logs.return_value.insert.assert_not_called()
+
+        service.log_followup(3, "email", "2024-01-01", "Cy", "Corp")
+
+    rows = followup_logs.return_value.insert.call_args.args[0]
+    assert [r["sheet_row"] for r in rows] == [1, 2, 3]
+    assert service._pending == []
+
+
+def test_flush_keeps_rows_on_failure(followup_logs):
+    """Test rows stay buffered when the insert fails."""
+    service = SupabaseService()
+    followup_logs.return_value.insert.return_value.execute.side_effect = RuntimeError("down")
+    with patch.object(module, "FOLLOWUP_LOG_FLUSH_INTERVAL", 60):
+        service.log_followup(1, "email", "2024-01-01", "Ann", "Acme")
+
+    with pytest.raises(RuntimeError):
+        service.flush()
+    assert [r["sheet_row"] for r in service._pending] == [1]
+
+
+def test_reads_flush_pending_logs(followup_logs):
+    """Test reads write buffered rows first so they see them."""
+    service = SupabaseService()
+    followup_logs.return_value.select.return_value.eq.return_value.eq.return_value \
+        .execute.return_value.data = [{"id": 1}]
+    with patch.object(module, "FOLLOWUP_LOG_FLUSH_INTERVAL", 60):
+        service.log_followup(1, "email", "2024-01-01", "Ann", "Acme")
+
+    assert service.has_followup(1, "2024-01-01") is True
+    followup_logs.return_value.insert.assert_called_once()